@@ -0,0 +1,50 @@
+from sqlalchemy import func, select
+from list_queries.filters import FilterError
+from list_queries.keyset import PaginationError, keyset_query, keyset_result, wants_keyset, wants_total
+
+
+# List parameters of the Flask endpoints that the async reads do not serve.
+UNSUPPORTED_PARAMETERS = ('ids', 'stream', 'page', 'per_page', 'sort')
+
+
+class ReadResource:
+    """The list and get-by-id reads of one model, run on an AsyncSession.
+
+    Built from the encoder, filters and key orderings of the model's Flask
+    endpoints, so async_reads answers the same query string with the same
+    JSON. Only cursor pages are listed (?limit or ?after, with ?order_by and
+    ?with_total): a list without them, which the Flask endpoint answers
+    with the whole table, is rejected like the other parameters it does
+    not serve.
+    """
+
+    def __init__(self, path, collection, primary_key, encoder, filters, orderings, name):
+        self.path = path
+        self.collection = collection
+        self.primary_key = primary_key
+        self.encoder = encoder
+        self.filters = filters
+        self.orderings = orderings
+        self.name = name
+
+    async def list(self, session, args):
+        for parameter in UNSUPPORTED_PARAMETERS:
+            if parameter in args:
+                raise FilterError(f'{parameter} is not supported by the async read endpoints')
+        if not wants_keyset(args):
+            raise PaginationError('limit or after is required by the async read endpoints')
+        fields = self.encoder.requested_fields(args)
+        query = self.filters.apply(self.encoder.statement(fields, self.orderings), args)
+        page_query, ordering, columns, limit = keyset_query(query, self.orderings, args)
+        rows = (await session.execute(page_query)).all()
+        page = keyset_result(rows, ordering, columns, limit, self.encoder.serializer(fields), self.collection)
+        if wants_total(args):
+            page[f'total_{self.collection}'] = await session.scalar(
+                select(func.count()).select_from(query.order_by(None).subquery()))
+        return page
+
+    async def get(self, session, key, args):
+        """The row whose primary key is `key`, serialized, or None."""
+        fields = self.encoder.requested_fields(args)
+        row = (await session.execute(self.encoder.statement(fields).where(self.primary_key == key))).first()
+        return self.encoder.serializer(fields)(row) if row is not None else None
@@ -0,0 +1,174 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from os import environ
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import column, event, insert, inspect, table
+
+
+logger = logging.getLogger(__name__)
+
+log_table = table('log', column('user_id'), column('activity_type'), column('activity_description'),
+                  column('timestamp'), schema='asiguraez')
+
+AUDIT_BACKLOG = Gauge('audit_backlog_events', 'Audit events waiting to be written to Log')
+AUDIT_WRITTEN = Counter('audit_events_written_total', 'Audit events written to Log')
+AUDIT_DROPPED = Counter('audit_events_dropped_total', 'Audit events dropped because the backlog was full')
+AUDIT_FLUSH_FAILURES = Counter('audit_flush_failures_total', 'Batches that could not be written to Log')
+AUDIT_FLUSH_SECONDS = Histogram('audit_flush_seconds', 'Time spent writing one batch to Log')
+
+
+class AuditPipeline:
+    """Records writes made through the session and stores them in Log in batches.
+
+    Changes are collected while a transaction runs and queued only once it
+    commits, so rolled back work is never logged. A rolled back SAVEPOINT
+    drops only the changes made since it began, and a released one keeps
+    them for the enclosing transaction. A background thread
+    writes the queue to Log with one multi-row INSERT per batch, whenever
+    AUDIT_BATCH_SIZE events are waiting or AUDIT_FLUSH_INTERVAL seconds
+    have passed. This replaces the log_database_operation triggers.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.batch_size = int(environ.get('AUDIT_BATCH_SIZE', 500))
+        self.flush_interval = float(environ.get('AUDIT_FLUSH_INTERVAL', 1.0))
+        self._queue = queue.Queue(maxsize=int(environ.get('AUDIT_MAX_BACKLOG', 100000)))
+        self._engine = None
+        self._thread = None
+        self._pid = None
+        self._listening = False
+        self._lock = threading.Lock()
+        if app is not None and db is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        with app.app_context():
+            self._engine = db.engine
+        if self._listening:
+            return
+        event.listen(db.session, 'after_flush', self._collect_flush)
+        event.listen(db.session, 'do_orm_execute', self._collect_statement)
+        event.listen(db.session, 'after_transaction_create', self._mark_savepoint)
+        event.listen(db.session, 'after_commit', self._publish)
+        event.listen(db.session, 'after_rollback', self._discard)
+        atexit.register(self.flush)
+        self._listening = True
+
+    def backlog(self):
+        return self._queue.qsize()
+
+    def flush(self):
+        while not self._queue.empty():
+            self._write(self._drain(block=False))
+
+    def _collect_flush(self, session, flush_context):
+        events = session.info.setdefault('audit_events', [])
+        for operation, objects in (('INSERT', session.new), ('UPDATE', session.dirty),
+                                   ('DELETE', session.deleted)):
+            for obj in objects:
+                if operation == 'UPDATE' and not session.is_modified(obj):
+                    continue
+                mapper = inspect(obj).mapper
+                keys = ', '.join(f'{column.key}={value}' for column, value
+                                 in zip(mapper.primary_key, mapper.primary_key_from_instance(obj)))
+                events.append(_event(operation, f'{mapper.local_table.name} {keys}'))
+
+    def _collect_statement(self, orm_execute_state):
+        if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+            return None
+        result = orm_execute_state.invoke_statement()
+        statement = orm_execute_state.statement
+        operation = 'INSERT' if orm_execute_state.is_insert else 'UPDATE' if orm_execute_state.is_update else 'DELETE'
+        parameters = orm_execute_state.parameters
+        rows = len(parameters) if isinstance(parameters, list) else 1
+        events = orm_execute_state.session.info.setdefault('audit_events', [])
+        events.append(_event(operation, f'{statement.table.name} bulk statement, {rows} parameter set(s)'))
+        return result
+
+    def _mark_savepoint(self, session, transaction):
+        if transaction.nested:
+            session.info.setdefault('audit_savepoints', []).append(len(session.info.get('audit_events', ())))
+
+    def _publish(self, session):
+        # Both fire for SAVEPOINTs too, while the savepoint is still the session's nested transaction.
+        if session.in_nested_transaction():
+            session.info['audit_savepoints'].pop()
+            return
+        session.info.pop('audit_savepoints', None)
+        events = session.info.pop('audit_events', None)
+        if not events:
+            return
+        self._ensure_started()
+        for audit_event in events:
+            try:
+                self._queue.put_nowait(audit_event)
+                AUDIT_BACKLOG.inc()
+            except queue.Full:
+                AUDIT_DROPPED.inc()
+
+    def _discard(self, session):
+        if session.in_nested_transaction():
+            del session.info.get('audit_events', [])[session.info['audit_savepoints'].pop():]
+            return
+        session.info.pop('audit_savepoints', None)
+        session.info.pop('audit_events', None)
+
+    def _ensure_started(self):
+        # Started lazily, and again after a fork, since threads do not survive fork().
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='audit-log', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = self._drain(block=True)
+            if batch:
+                self._write(batch)
+
+    def _drain(self, block):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            try:
+                if block:
+                    batch.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0.001)))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if block and time.monotonic() >= deadline:
+                break
+        return batch
+
+    def _write(self, batch):
+        if not batch:
+            return
+        AUDIT_BACKLOG.dec(len(batch))
+        start = time.perf_counter()
+        try:
+            with self._engine.begin() as connection:
+                connection.execute(insert(log_table), batch)
+            AUDIT_WRITTEN.inc(len(batch))
+        except Exception:
+            AUDIT_FLUSH_FAILURES.inc()
+            logger.exception('Could not write %d audit events to Log', len(batch))
+        finally:
+            AUDIT_FLUSH_SECONDS.observe(time.perf_counter() - start)
+
+
+def _event(operation, description):
+    return {
+        'user_id': None,
+        'activity_type': operation,
+        'activity_description': description,
+        'timestamp': datetime.utcnow()
+    }
@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from audit_log.pipeline import AuditPipeline
+from bulk_insert.loader import bulk_insert
+
+
+class CollectingPipeline(AuditPipeline):
+    # Keeps published events in the queue instead of writing them to Log.
+    def _ensure_started(self):
+        pass
+
+    def published(self):
+        return [self._queue.get_nowait()['activity_description'] for _ in range(self._queue.qsize())]
+
+
+class SavepointTest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        self.db = db = SQLAlchemy(self.app)
+
+        class Claim(db.Model):
+            __tablename__ = 'claims'
+            claim_id = db.Column(db.Integer, primary_key=True)
+            claim_number = db.Column(db.String(20), unique=True, nullable=False)
+
+        self.Claim = Claim
+        self.context = self.app.app_context()
+        self.context.push()
+        # pysqlite emits BEGIN itself and breaks SAVEPOINT; let SQLAlchemy do it.
+        event.listen(db.engine, 'connect', lambda connection, record: setattr(connection, 'isolation_level', None))
+        event.listen(db.engine, 'begin', lambda connection: connection.exec_driver_sql('BEGIN'))
+        db.create_all()
+        self.audit = CollectingPipeline(self.app, db)
+
+    def tearDown(self):
+        self.db.session.remove()
+        self.context.pop()
+
+    def test_rolled_back_savepoint_keeps_earlier_events(self):
+        session = self.db.session
+        session.add(self.Claim(claim_id=1, claim_number='C1'))
+        session.flush()
+        savepoint = session.begin_nested()
+        session.add(self.Claim(claim_id=2, claim_number='C2'))
+        session.flush()
+        savepoint.rollback()
+        session.commit()
+        self.assertEqual(self.audit.published(), ['claims claim_id=1'])
+
+    def test_released_savepoint_is_published_with_its_transaction(self):
+        session = self.db.session
+        with session.begin_nested():
+            session.add(self.Claim(claim_id=1, claim_number='C1'))
+        self.assertEqual(self.audit.published(), [])
+        session.rollback()
+        self.assertEqual(self.audit.published(), [])
+
+    def test_bulk_insert_fallback_logs_every_inserted_row(self):
+        rows = [({'claim_number': number}, None) for number in ('C1', 'C2', 'C1', 'C3')]
+        results = bulk_insert(self.db, self.Claim, iter(rows), dict)
+        self.assertEqual([result['status'] for result in results], ['created', 'created', 'failed', 'created'])
+        self.assertEqual(self.audit.published(), ['claims bulk statement, 1 parameter set(s)'] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
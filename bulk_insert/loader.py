@@ -0,0 +1,122 @@
+import json
+from decimal import InvalidOperation
+from flask import current_app, request
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from hosting.request_timing import expected_repeats
+
+
+DEFAULT_TRANSACTION_SIZE = 5000
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+class BulkPayloadError(ValueError):
+    pass
+
+
+def iter_payload_rows():
+    """Yield (row, error) pairs from a JSON array or an NDJSON request body.
+
+    NDJSON bodies are read line by line from the request stream, so a feed
+    of any size is never held in memory as a whole.
+    """
+    if request.mimetype == NDJSON_MIMETYPE:
+        for line in request.stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line), None
+            except ValueError as e:
+                yield None, f'Malformed JSON: {e}'
+        return
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise BulkPayloadError('Expected a JSON array or an application/x-ndjson body')
+    for row in data:
+        yield row, None
+
+
+def parse_integer(value, name):
+    """int(value) for a parse_row; bools and fractional numbers are rejected instead of coerced."""
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(f'{name} must be an integer, got {value!r}')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be an integer, got {value!r}')
+
+
+def bulk_insert(db, model, rows, parse_row):
+    """Insert the rows that parse_row accepts and report on every one of them.
+
+    Valid rows are sent as multi-row INSERT ... RETURNING statements and
+    committed BULK_TRANSACTION_SIZE rows at a time. When a transaction is
+    rejected, its rows are retried one by one so only the offending rows
+    are reported as failed.
+    """
+    transaction_size = current_app.config.get('BULK_TRANSACTION_SIZE', DEFAULT_TRANSACTION_SIZE)
+    primary_key = model.__mapper__.primary_key[0]
+    results = []
+    batch = []
+    for index, (row, error) in enumerate(rows):
+        if error is None:
+            try:
+                batch.append((index, parse_row(row)))
+            except (KeyError, ValueError, TypeError, InvalidOperation) as e:
+                error = _describe_row_error(e)
+        if error is not None:
+            results.append({'index': index, 'status': 'invalid', 'message': error})
+            continue
+        if len(batch) >= transaction_size:
+            results.extend(_insert_batch(db, model, primary_key, batch))
+            batch = []
+    if batch:
+        results.extend(_insert_batch(db, model, primary_key, batch))
+
+    results.sort(key=lambda result: result['index'])
+    return results
+
+
+def summarize(results):
+    summary = {'created': 0, 'invalid': 0, 'failed': 0}
+    for result in results:
+        summary[result['status']] += 1
+    return summary
+
+
+def _insert_batch(db, model, primary_key, batch):
+    statement = insert(model).returning(primary_key, sort_by_parameter_order=True)
+    try:
+        ids = db.session.scalars(statement, [values for _, values in batch]).all()
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        return _insert_individually(db, model, primary_key, batch)
+    return [{'index': index, 'status': 'created', primary_key.key: new_id}
+            for (index, _), new_id in zip(batch, ids)]
+
+
+def _insert_individually(db, model, primary_key, batch):
+    statement = insert(model).returning(primary_key)
+    results = []
+    with expected_repeats():
+        for index, values in batch:
+            try:
+                with db.session.begin_nested():
+                    new_id = db.session.scalar(statement, values)
+                results.append({'index': index, 'status': 'created', primary_key.key: new_id})
+            except SQLAlchemyError as e:
+                results.append({'index': index, 'status': 'failed', 'message': str(getattr(e, 'orig', None) or e)})
+        db.session.commit()
+    return results
+
+
+def _describe_row_error(error):
+    if isinstance(error, KeyError):
+        return f'Missing field {error.args[0]}'
+    if isinstance(error, InvalidOperation):
+        return 'Invalid decimal value'
+    return str(error) or error.__class__.__name__
@@ -0,0 +1,14 @@
+from flask_sqlalchemy import SQLAlchemy
+from prometheus_flask_exporter import PrometheusMetrics
+from audit_log.pipeline import AuditPipeline
+from hosting.replicas import RoutingSession
+from rate_limiting.limiter import create_limiter
+
+
+# Shared by every service blueprint. In standalone mode each process still
+# gets its own app, engine and registry; in consolidated mode all the
+# services share the ones below.
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+metrics = PrometheusMetrics.for_app_factory()
+audit = AuditPipeline()
+limiter = create_limiter()
@@ -0,0 +1,97 @@
+import time
+from os import environ
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+POOL_SIZE = Gauge('db_pool_size', 'Connections kept open by the pool', ['pool'])
+POOL_CHECKED_OUT = Gauge('db_pool_checked_out_connections', 'Connections currently checked out', ['pool'])
+POOL_OVERFLOW = Gauge('db_pool_overflow_connections', 'Connections open beyond the pool size', ['pool'])
+POOL_CHECKOUT_SECONDS = Histogram('db_pool_checkout_seconds', 'Time spent waiting for a connection', ['pool'],
+                                  buckets=(.001, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30))
+POOL_CHECKOUT_TIMEOUTS = Counter('db_pool_checkout_timeouts_total',
+                                 'Checkouts that gave up after DB_POOL_TIMEOUT seconds', ['pool'])
+POOL_OVERFLOW_CHECKOUTS = Counter('db_pool_overflow_checkouts_total',
+                                  'Checkouts made while the pool was running in overflow', ['pool'])
+POOL_CONNECTIONS_OPENED = Counter('db_pool_connections_opened_total', 'New database connections opened', ['pool'])
+POOL_INVALIDATIONS = Counter('db_pool_invalidations_total', 'Connections discarded as invalid', ['pool'])
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports how long callers wait for a connection.
+
+    SQLAlchemy has no pool event that fires before a checkout starts, so
+    the wait is timed here; everything else is recorded from pool events
+    in instrument_pool. The pool's logging name is used as the label.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.labels(self.logging_name).inc()
+            raise
+        finally:
+            POOL_CHECKOUT_SECONDS.labels(self.logging_name).observe(time.perf_counter() - start)
+
+
+def engine_options(database_uri, pool_name):
+    """SQLALCHEMY_ENGINE_OPTIONS built from the DB_* environment variables.
+
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT (seconds),
+    DB_POOL_RECYCLE (seconds, -1 to disable) and DB_POOL_PRE_PING size the
+    pool. On PostgreSQL, DB_STATEMENT_TIMEOUT (milliseconds, 0 to disable)
+    and DB_APPLICATION_NAME are sent as connection parameters, so each
+    service shows up under its own name in pg_stat_activity. Engines for
+    create_async_engine (postgresql+asyncpg) get the same settings on an
+    AsyncAdaptedQueuePool.
+    """
+    is_async = database_uri.startswith('postgresql+asyncpg')
+    options = {
+        'poolclass': AsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        'pool_logging_name': pool_name,
+        'pool_size': int(environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': environ.get('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    }
+    if database_uri.startswith('postgresql'):
+        application_name = environ.get('DB_APPLICATION_NAME', f'asiguraez-{pool_name}')
+        statement_timeout = int(environ.get('DB_STATEMENT_TIMEOUT', 30000))
+        if is_async:
+            # asyncpg takes run-time parameters as server_settings instead of libpq options.
+            server_settings = {'application_name': application_name}
+            if statement_timeout > 0:
+                server_settings['statement_timeout'] = str(statement_timeout)
+            options['connect_args'] = {'server_settings': server_settings}
+        else:
+            connect_args = {'application_name': application_name}
+            if statement_timeout > 0:
+                connect_args['options'] = f'-c statement_timeout={statement_timeout}'
+            options['connect_args'] = connect_args
+    return options
+
+
+def instrument_pool(engine, pool_name):
+    # The gauges read engine.pool when scraped, so they keep following the
+    # engine after dispose() swaps in a new pool.
+    POOL_SIZE.labels(pool_name).set_function(lambda: engine.pool.size())
+    POOL_CHECKED_OUT.labels(pool_name).set_function(lambda: engine.pool.checkedout())
+    POOL_OVERFLOW.labels(pool_name).set_function(lambda: max(engine.pool.overflow(), 0))
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        POOL_CONNECTIONS_OPENED.labels(pool_name).inc()
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        if engine.pool.overflow() > 0:
+            POOL_OVERFLOW_CHECKOUTS.labels(pool_name).inc()
+
+    @event.listens_for(engine, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        POOL_INVALIDATIONS.labels(pool_name).inc()
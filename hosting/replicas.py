@@ -0,0 +1,154 @@
+import logging
+import os
+import threading
+import time
+from os import environ
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from prometheus_client import Counter, Gauge
+from sqlalchemy import create_engine, event, text
+from hosting.pool import engine_options, instrument_pool
+from hosting.request_timing import instrument_queries
+
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Set on responses to writes; while it is valid the client's reads go to the
+# primary, so they see their own writes even if the replicas lag behind.
+READ_PRIMARY_COOKIE = 'db_read_primary_until'
+
+REPLICA_UP = Gauge('db_replica_up', 'Whether the replica passed its last health check', ['replica'])
+REPLICA_READS = Counter('db_replica_routed_total', 'Sessions whose reads were routed', ['target'])
+
+
+class ReplicaSet:
+    """Round-robin over the replica engines that passed their last health check.
+
+    Every replica runs SELECT 1 once up front and then from a daemon
+    thread each `health_interval` seconds. A replica whose connection fails during a request is also
+    taken out straight away, until the next check it passes. choose()
+    returns None when no replica is healthy, and callers use the primary.
+    """
+
+    def __init__(self, engines, health_interval=5.0):
+        self.engines = engines
+        self.health_interval = health_interval
+        self._healthy = {engine: True for engine in engines}
+        self._next = 0
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        for engine in engines:
+            REPLICA_UP.labels(_label(engine)).set(1)
+            event.listen(engine, 'handle_error', self._on_error)
+        self.check()
+
+    def choose(self):
+        self._ensure_started()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                engine = self.engines[self._next % len(self.engines)]
+                self._next += 1
+                if self._healthy[engine]:
+                    return engine
+        return None
+
+    def mark(self, engine, healthy):
+        if self._healthy[engine] != healthy:
+            logger.warning('Replica %s is %s', _label(engine), 'back up' if healthy else 'down')
+        self._healthy[engine] = healthy
+        REPLICA_UP.labels(_label(engine)).set(1 if healthy else 0)
+
+    def check(self):
+        for engine in self.engines:
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text('SELECT 1'))
+                self.mark(engine, True)
+            except Exception:
+                self.mark(engine, False)
+
+    def _on_error(self, context):
+        # context.connection is None when the connection could not even be opened.
+        if context.is_disconnect or context.connection is None:
+            self.mark(context.engine, False)
+
+    def _ensure_started(self):
+        # Same lazy, fork-aware start as the audit pipeline.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='replica-health', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.health_interval)
+            self.check()
+
+
+class RoutingSession(Session):
+    """Session that sends the SELECTs of read-only requests to a replica.
+
+    Writes, flushes and anything outside a GET/HEAD/OPTIONS request go to
+    the primary, as do reads from clients holding READ_PRIMARY_COOKIE and
+    those of requests that called read_primary().
+    The replica is picked once per session, so all reads of one request
+    see the same snapshot source.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and getattr(clause, 'is_select', False):
+            replica = self._replica()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica(self):
+        if 'replica' not in self.info:
+            replicas = current_app.extensions.get('db_replicas') if has_request_context() else None
+            self.info['replica'] = replicas.choose() if replicas and reads_from_replica() else None
+            REPLICA_READS.labels('replica' if self.info['replica'] is not None else 'primary').inc()
+        return self.info['replica']
+
+
+def read_primary():
+    """Send the rest of this request's reads to the primary, e.g. to fill a shared cache."""
+    g.db_read_primary = True
+
+
+def reads_from_replica():
+    if request.method not in SAFE_METHODS or g.get('db_read_primary'):
+        return False
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) <= time.time()
+    except ValueError:
+        return True
+
+
+def init_replicas(app, pool_name, uris):
+    """Create one pooled engine per replica URI and route the app's reads to them."""
+    engines = []
+    for number, uri in enumerate(uris, start=1):
+        name = f'{pool_name}-replica{number}'
+        engine = create_engine(uri, **engine_options(uri, name))
+        instrument_pool(engine, name)
+        instrument_queries(engine)
+        engines.append(engine)
+    app.extensions['db_replicas'] = ReplicaSet(engines, float(environ.get('REPLICA_HEALTH_INTERVAL', 5)))
+    sticky_seconds = int(environ.get('REPLICA_READ_YOUR_WRITES_SECONDS', 5))
+
+    @app.after_request
+    def pin_writers_to_primary(response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(READ_PRIMARY_COOKIE, str(time.time() + sticky_seconds),
+                                max_age=sticky_seconds, httponly=True, samesite='Lax')
+        return response
+
+
+def _label(engine):
+    return engine.pool.logging_name or repr(engine.url)
@@ -0,0 +1,130 @@
+import logging
+import time
+from collections import Counter as StatementCounter, defaultdict
+from contextlib import contextmanager
+from os import environ
+from flask import g, has_request_context, request
+from prometheus_client import Counter, Histogram
+from sqlalchemy import event
+
+
+logger = logging.getLogger(__name__)
+
+REPEATED_STATEMENT_THRESHOLD = int(environ.get('DB_REPEATED_STATEMENT_THRESHOLD', 10))
+
+REQUEST_QUERIES = Histogram('db_queries_per_request', 'SQL statements executed while serving one request', ['endpoint'],
+                            buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250))
+REQUEST_QUERY_SECONDS = Histogram('db_query_seconds_per_request', 'Time spent in SQL while serving one request', ['endpoint'],
+                                  buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5))
+REPEATED_STATEMENTS = Counter('db_repeated_statements_total',
+                              'Requests that ran one statement more than DB_REPEATED_STATEMENT_THRESHOLD times',
+                              ['endpoint'])
+
+
+class RequestTiming:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = defaultdict(float)
+        self.queries = 0
+        self.statements = StatementCounter()
+        self.repeats_expected = 0
+
+    def add_query(self, statement, seconds, executemany=False):
+        self.queries += 1
+        self.phases['db'] += seconds
+        # SQLAlchemy statements are parameterized, so the text alone groups
+        # the "same query, different id" executions of an N+1 loop. Batches
+        # of one executemany() and loops marked with expected_repeats() are
+        # repeated on purpose.
+        if not executemany and not self.repeats_expected:
+            self.statements[statement] += 1
+
+
+def current_timing():
+    if not has_request_context():
+        return None
+    if 'request_timing' not in g:
+        g.request_timing = RequestTiming()
+    return g.request_timing
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to `phase` of the current request's Server-Timing."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing = current_timing()
+        if timing is not None:
+            timing.phases[phase] += time.perf_counter() - start
+
+
+@contextmanager
+def expected_repeats():
+    """Leave the statements run in the block out of the N+1 check, for loops that repeat one on purpose."""
+    timing = current_timing()
+    if timing is not None:
+        timing.repeats_expected += 1
+    try:
+        yield
+    finally:
+        if timing is not None:
+            timing.repeats_expected -= 1
+
+
+def instrument_queries(engine):
+    """Count and time every statement `engine` runs on behalf of a request."""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timing = current_timing()
+    if timing is not None:
+        timing.add_query(statement, time.perf_counter() - context.query_started, executemany)
+
+
+def init_request_timing(app):
+    """Report each request's SQL work as metrics and as a Server-Timing header.
+
+    The header carries db (with the statement count), serialize and auth,
+    plus the total time before the response was returned. A request that
+    runs one statement more than DB_REPEATED_STATEMENT_THRESHOLD times is
+    logged as a likely N+1 and counted in db_repeated_statements_total;
+    executemany() batches and expected_repeats() blocks are not checked.
+    Rows a streamed response reads after it has started are not included.
+    """
+    app.before_request(_start)
+    app.after_request(_report)
+
+
+def _start():
+    current_timing()
+
+
+def _report(response):
+    timing = g.pop('request_timing', None)
+    if timing is None:
+        return response
+    endpoint = request.endpoint or 'unknown'
+    REQUEST_QUERIES.labels(endpoint).observe(timing.queries)
+    REQUEST_QUERY_SECONDS.labels(endpoint).observe(timing.phases['db'])
+
+    if timing.statements:
+        statement, executions = timing.statements.most_common(1)[0]
+        if executions > REPEATED_STATEMENT_THRESHOLD:
+            REPEATED_STATEMENTS.labels(endpoint).inc()
+            logger.warning('%s %s ran the same statement %d times, a likely N+1 query: %s',
+                           request.method, request.path, executions, ' '.join(statement.split())[:200])
+
+    entries = [f'db;dur={timing.phases["db"] * 1000:.2f};desc="queries: {timing.queries}"']
+    entries += [f'{phase};dur={timing.phases[phase] * 1000:.2f}' for phase in ('serialize', 'auth') if phase in timing.phases]
+    entries.append(f'total;dur={(time.perf_counter() - timing.started) * 1000:.2f}')
+    response.headers.add('Server-Timing', ', '.join(entries))
+    return response
@@ -0,0 +1,44 @@
+from os import environ
+from flask import Flask
+from flask_cors import CORS
+from json_encoding.provider import OrjsonProvider
+from hosting.extensions import audit, db, limiter, metrics
+from hosting.pool import engine_options, instrument_pool
+from hosting.replicas import init_replicas
+from hosting.request_timing import init_request_timing, instrument_queries
+
+
+def create_service_app(import_name, blueprints, config):
+    """Build an app serving `blueprints` on one engine, pool and metrics registry.
+
+    Each service calls this with its own blueprint to run standalone;
+    hosting.consolidated calls it once with every blueprint. The pool is
+    sized from the DB_* environment variables unless the config already
+    sets SQLALCHEMY_ENGINE_OPTIONS. When DATABASE_REPLICA_URLS lists
+    replicas (comma separated), reads of GET requests are served by them.
+    """
+    pool_name = blueprints[0].name if len(blueprints) == 1 else 'consolidated'
+    app = Flask(import_name)
+    app.json = OrjsonProvider(app)
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config.update(config)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS',
+                          engine_options(app.config['SQLALCHEMY_DATABASE_URI'], pool_name))
+    app.config.setdefault('SQLALCHEMY_REPLICA_URIS',
+                          [uri.strip() for uri in environ.get('DATABASE_REPLICA_URLS', '').split(',') if uri.strip()])
+    CORS(app)
+
+    db.init_app(app)
+    with app.app_context():
+        instrument_pool(db.engine, pool_name)
+        instrument_queries(db.engine)
+    if app.config['SQLALCHEMY_REPLICA_URIS']:
+        init_replicas(app, pool_name, app.config['SQLALCHEMY_REPLICA_URIS'])
+    audit.init_app(app, db)
+    metrics.init_app(app)
+    limiter.init_app(app)
+    init_request_timing(app)
+
+    for blueprint in blueprints:
+        app.register_blueprint(blueprint)
+    return app
@@ -0,0 +1,87 @@
+"""Rows per second of GET /claims serialization, before and after ModelEncoder.
+
+Run from the repository root:
+
+    python -m json_encoding.benchmark --rows 50000
+    python -m json_encoding.benchmark --from-db
+
+The default compares serialization alone, on synthetic claims held in
+memory. --from-db reads the claims table from the database configured
+in serviciu_claims, so the ORM loading that ModelEncoder also avoids is
+included in both timings.
+"""
+import argparse
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
+
+import serviciu_claims.app as claims
+
+
+def synthetic_rows(count):
+    start = datetime(2024, 1, 1, 8, 30, 15, 123456)
+    return [(claim_id, claim_id % 500 + 1, date(2024, 1, 1) + timedelta(days=claim_id % 365),
+             Decimal(claim_id % 10000) + Decimal('0.25'), ('pending', 'approved', 'rejected')[claim_id % 3],
+             start + timedelta(seconds=claim_id)) for claim_id in range(1, count + 1)]
+
+
+def claim_objects(rows):
+    return [claims.Claim(claim_id=claim_id, policy_id=policy_id, claim_date=claim_date, claim_amount=claim_amount,
+                         status=status, created_at=created_at)
+            for claim_id, policy_id, claim_date, claim_amount, status, created_at in rows]
+
+
+def measure(label, count, build_response, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = build_response()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f'{label:<40} {count / best:>12,.0f} rows/s   ({best * 1000:.1f} ms, {len(response.get_data()):,} bytes)')
+    return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--from-db', action='store_true')
+    args = parser.parse_args()
+
+    app = claims.create_app()
+    orjson_provider = app.json
+    stdlib_provider = DefaultJSONProvider(app)
+
+    with app.app_context():
+        if args.from_db:
+            count = claims.Claim.query.count()
+            load_objects = claims.Claim.query.all
+            load_rows = lambda: claims.claim_encoder.all(claims.Claim.query)
+        else:
+            rows = synthetic_rows(args.rows)
+            objects = claim_objects(rows)
+            count = len(rows)
+            load_objects = lambda: objects
+            serialize = claims.claim_encoder.serializer(claims.claim_encoder.names)
+            load_rows = lambda: [serialize(values) for values in rows]
+
+        def before():
+            app.json = stdlib_provider
+            return jsonify([claim.json_claim() for claim in load_objects()])
+
+        def after():
+            app.json = orjson_provider
+            return claims.json_response(load_rows(), 200)
+
+        print(f'{count:,} claims, best of {args.repeat}')
+        old = measure('json_claim() + stdlib jsonify', count, before, args.repeat)
+        new = measure('ModelEncoder + orjson', count, after, args.repeat)
+        if old.get_json() != new.get_json():
+            raise SystemExit('The two responses differ')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+import orjson
+from flask.json.provider import DefaultJSONProvider
+from hosting.request_timing import timed
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson.
+
+    Keys are sorted and Decimals and UUIDs go through the default
+    provider's default() hook, as before. Two things differ: non-ASCII
+    text is written as UTF-8 instead of \\u escapes, and dates and
+    datetimes are written in ISO 8601, the format the json_* methods and
+    ModelEncoder use, rather than as HTTP dates. Request bodies are still
+    parsed by the default provider.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return self._dump_bytes(obj, kwargs.get('indent')).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dump_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
+
+    def _dump_bytes(self, obj, indent=None):
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        with timed('serialize'):
+            return orjson.dumps(obj, default=self.default, option=option)
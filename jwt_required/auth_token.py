@@ -1,6 +1,67 @@
 import jwt
+import hashlib
+import time
+from collections import OrderedDict
 from functools import wraps
+from os import environ
+from threading import Lock
 from flask import request, jsonify, current_app
+from prometheus_client import Counter
+from hosting.request_timing import timed
+
+
+TOKEN_CACHE_HITS = Counter('jwt_token_cache_hits_total', 'Tokens served from the verified token cache')
+TOKEN_CACHE_MISSES = Counter('jwt_token_cache_misses_total', 'Tokens that needed signature verification')
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of token digests to payloads that already passed jwt.decode.
+
+    Entries expire at the token's own exp claim, so a cached token is never
+    accepted after jwt.decode itself would have rejected it as expired.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            payload, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def put(self, key, payload, expires_at):
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+token_cache = VerifiedTokenCache(int(environ.get('JWT_CACHE_SIZE', 1024)))
+
+
+def decode_token(token, secret_key):
+    # The secret is part of the digest so apps with different keys never share entries.
+    key = hashlib.sha256(f'{secret_key}\0{token}'.encode('utf-8')).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        TOKEN_CACHE_HITS.inc()
+        return payload
+
+    TOKEN_CACHE_MISSES.inc()
+    payload = jwt.decode(token, secret_key, algorithms=['HS256'])
+    if isinstance(payload.get('exp'), (int, float)):
+        token_cache.put(key, payload, payload['exp'])
+    return payload
 
 
 def jwt_auth(func):
@@ -13,7 +74,8 @@ def jwt_auth(func):
             return jsonify({'message' : 'Token is not in the header!'}), 401
         try:
             secret_key = current_app.config.get('SECRET_KEY')
-            payload = jwt.decode(token,secret_key , algorithms=['HS256'])
+            with timed('auth'):
+                payload = decode_token(token, secret_key)
             if(payload.get('role')=='admin'):
                 return func(*args, **kwargs)
             else:
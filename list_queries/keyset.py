@@ -0,0 +1,155 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from flask import request
+from sqlalchemy import tuple_
+
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 500
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def key_orderings(primary_key, *columns):
+    """Build the orderings a list endpoint accepts in cursor mode.
+
+    The primary key alone is always available; every extra column (usually
+    created_at) gets the primary key appended as a tie breaker so the key
+    stays unique.
+    """
+    orderings = {primary_key.key: (primary_key,)}
+    for column in columns:
+        orderings[column.key] = (column, primary_key)
+    return orderings
+
+
+def wants_keyset(args=None):
+    args = request.args if args is None else args
+    return 'after' in args or 'limit' in args
+
+
+def encode_cursor(ordering, values):
+    payload = json.dumps({'o': ordering, 'v': [_dump_value(value) for value in values]},
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, ordering, columns):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        values = payload['v']
+        if payload['o'] != ordering or len(values) != len(columns):
+            raise PaginationError('Cursor does not match the requested ordering')
+        return [_load_value(column, value) for column, value in zip(columns, values)]
+    except PaginationError:
+        raise
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+        raise PaginationError('Invalid cursor')
+
+
+def keyset_page(query, orderings, serialize, collection):
+    """Return one page of `query` starting after the `after` cursor.
+
+    Rows are read with WHERE key > cursor ORDER BY key LIMIT n, so the cost
+    depends on the page size only and not on how deep the client is. A
+    nullable ordering column (created_at) sorts its NULLs last, and the
+    cursor carries a NULL like any other value.
+    The total is counted only when the caller asks for it with with_total.
+    """
+    page_query, ordering, columns, limit = keyset_query(query, orderings)
+    page = keyset_result(page_query.all(), ordering, columns, limit, serialize, collection)
+    if wants_total():
+        page[f'total_{collection}'] = query.order_by(None).count()
+    return page
+
+
+def keyset_query(query, orderings, args=None):
+    """The page query keyset_page runs, with the ordering, its columns and the limit.
+
+    `query` may be an ORM query or a Core select, so async callers can run
+    the page themselves and hand the rows to keyset_result.
+    """
+    args = request.args if args is None else args
+    ordering = args.get('order_by', next(iter(orderings)))
+    if ordering not in orderings:
+        raise PaginationError(f'Cannot order by {ordering}')
+    columns = orderings[ordering]
+    limit = _parse_limit(args)
+
+    after = args.get('after')
+    if after:
+        values = decode_cursor(after, ordering, columns)
+        if len(columns) == 1:
+            query = query.filter(columns[0] > values[0])
+        elif values[0] is None:
+            # NULLs sort last, so only NULL rows with a greater key follow a NULL.
+            query = query.filter(columns[0].is_(None), columns[1] > values[1])
+        elif _nullable(columns[0]):
+            # The greater keys, then the NULLs that sort after all of them. An OR
+            # would walk the index from the start; two limited ranges stay cheap.
+            query = (query.filter(tuple_(*columns) > tuple_(*values)).order_by(*columns).limit(limit + 1)
+                     .union_all(query.filter(columns[0].is_(None)).order_by(*columns).limit(limit + 1)))
+        else:
+            query = query.filter(tuple_(*columns) > tuple_(*values))
+    # One row past the limit tells whether there is a next page.
+    return query.order_by(*columns).limit(limit + 1), ordering, columns, limit
+
+
+def keyset_result(rows, ordering, columns, limit, serialize, collection):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(ordering, [getattr(rows[-1], column.key) for column in columns])
+    return {
+        collection: [serialize(row) for row in rows],
+        'next_cursor': next_cursor
+    }
+
+
+def wants_total(args=None):
+    args = request.args if args is None else args
+    return args.get('with_total', '').lower() in ('1', 'true', 'yes')
+
+
+def _parse_limit(args):
+    try:
+        limit = int(args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise PaginationError('limit must be an integer')
+    if limit < 1:
+        raise PaginationError('limit must be positive')
+    return min(limit, MAX_LIMIT)
+
+
+def _dump_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _nullable(column):
+    return getattr(column.expression, 'nullable', False)
+
+
+def _load_value(column, value):
+    if value is None:
+        if _nullable(column):
+            return None
+        raise PaginationError('Invalid cursor')
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
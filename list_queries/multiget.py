@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+from os import environ
+from threading import Lock
+from flask import request
+from list_queries.filters import FilterError
+
+
+MULTIGET_MAX_IDS = int(environ.get('MULTIGET_MAX_IDS', 100))
+ENTITY_CACHE_SIZE = int(environ.get('ENTITY_CACHE_SIZE', 10000))
+ENTITY_CACHE_TTL = float(environ.get('ENTITY_CACHE_TTL', 30))
+
+
+def wants_ids():
+    return 'ids' in request.args
+
+
+def requested_ids():
+    """The distinct ids of ?ids=3,1,2 in the order given."""
+    if set(request.args) - {'ids', 'fields'}:
+        raise FilterError('ids can only be combined with fields')
+    try:
+        ids = list(dict.fromkeys(int(value) for value in request.args['ids'].split(',')))
+    except ValueError:
+        raise FilterError('ids must be a comma separated list of integers')
+    if len(ids) > MULTIGET_MAX_IDS:
+        raise FilterError(f'ids accepts at most {MULTIGET_MAX_IDS} values')
+    return ids
+
+
+class IdLookup:
+    """Answers GET /<resource>?ids=... from a per-id cache, then one IN query.
+
+    Rows are cached whole, as serialized by `encoder`, for `ttl` seconds
+    and at most `size` of them, least recently used first out. The ids
+    missing from the cache are read with a single WHERE pk IN (...) and
+    ?fields= is applied to the cached rows. Write handlers in this process
+    call forget(); the TTL bounds how long other workers may answer with a
+    row that changed elsewhere.
+    """
+
+    def __init__(self, encoder, primary_key, size=ENTITY_CACHE_SIZE, ttl=ENTITY_CACHE_TTL):
+        self.encoder = encoder
+        self.primary_key = primary_key
+        self.size = size
+        self.ttl = ttl
+        self._serialize = encoder.serializer(encoder.names)
+        self._rows = OrderedDict()
+        self._lock = Lock()
+
+    def get_many(self, query, fields):
+        ids = requested_ids()
+        now = time.monotonic()
+        rows = {}
+        with self._lock:
+            for key in ids:
+                cached = self._rows.get(key)
+                if cached is not None and now - cached[0] < self.ttl:
+                    self._rows.move_to_end(key)
+                    rows[key] = cached[1]
+
+        missing = [key for key in ids if key not in rows]
+        if missing:
+            loaded = self.encoder.select(query, self.encoder.names).filter(self.primary_key.in_(missing))
+            loaded = {row[self.primary_key.key]: row for row in map(self._serialize, loaded)}
+            with self._lock:
+                for key, row in loaded.items():
+                    self._rows[key] = (now, row)
+                    self._rows.move_to_end(key)
+                while len(self._rows) > self.size:
+                    self._rows.popitem(last=False)
+            rows.update(loaded)
+
+        # Unknown ids are left out; the caller can tell them from the ids it sent.
+        return [{name: rows[key][name] for name in fields} for key in ids if key in rows]
+
+    def forget(self, key):
+        with self._lock:
+            self._rows.pop(key, None)
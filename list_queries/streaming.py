@@ -0,0 +1,61 @@
+from flask import Response, current_app, request, stream_with_context
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def wants_stream():
+    return _stream_format() is not None
+
+
+def stream_rows(query, serialize):
+    """Stream every row of `query` as NDJSON or as one JSON array.
+
+    Rows are fetched through a server-side cursor chunk by chunk
+    (yield_per) and written out as soon as a chunk is serialized, so the
+    worker never holds more than one chunk in memory.
+    """
+    chunk_size = current_app.config.get('STREAM_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    # Executes the statement here so database errors still reach the
+    # caller's error handling before the response has started.
+    rows = iter(query.yield_per(chunk_size))
+    dumps = current_app.json.dumps
+
+    def generate_ndjson():
+        chunk = []
+        for row in rows:
+            chunk.append(dumps(serialize(row)))
+            if len(chunk) >= chunk_size:
+                yield '\n'.join(chunk) + '\n'
+                chunk = []
+        if chunk:
+            yield '\n'.join(chunk) + '\n'
+
+    def generate_array():
+        yield '['
+        separator = ''
+        chunk = []
+        for row in rows:
+            chunk.append(dumps(serialize(row)))
+            if len(chunk) >= chunk_size:
+                yield separator + ','.join(chunk)
+                separator = ','
+                chunk = []
+        if chunk:
+            yield separator + ','.join(chunk)
+        yield ']'
+
+    if _stream_format() == 'ndjson':
+        return Response(stream_with_context(generate_ndjson()), 200, mimetype=NDJSON_MIMETYPE)
+    return Response(stream_with_context(generate_array()), 200, mimetype='application/json')
+
+
+def _stream_format():
+    if 'stream' in request.args:
+        stream = request.args['stream']
+        return stream if stream in ('ndjson', 'json') else None
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return 'ndjson'
+    return None
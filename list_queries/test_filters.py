@@ -0,0 +1,100 @@
+import os
+import sys
+import unittest
+from datetime import date
+from decimal import Decimal
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from werkzeug.datastructures import MultiDict
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from list_queries.filters import MAX_IN_VALUES, FilterError, QueryFilter
+
+
+class QueryFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        self.db = db = SQLAlchemy(self.app)
+
+        class Claim(db.Model):
+            __tablename__ = 'claims'
+            claim_id = db.Column(db.Integer, primary_key=True)
+            claim_date = db.Column(db.Date, nullable=False)
+            claim_amount = db.Column(db.Numeric(15, 2), nullable=False)
+            status = db.Column(db.String(50), nullable=False)
+            is_closed = db.Column(db.Boolean, default=False)
+            notes = db.Column(db.String(255))
+
+        self.Claim = Claim
+        self.filters = QueryFilter(Claim.claim_id, Claim.claim_date, Claim.claim_amount, Claim.status, Claim.is_closed)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        db.session.add_all([
+            Claim(claim_id=1, claim_date=date(2024, 1, 10), claim_amount=Decimal('100.00'), status='pending', is_closed=False),
+            Claim(claim_id=2, claim_date=date(2024, 2, 10), claim_amount=Decimal('250.50'), status='approved', is_closed=True),
+            Claim(claim_id=3, claim_date=date(2024, 3, 10), claim_amount=Decimal('250.50'), status='pending', is_closed=False),
+            Claim(claim_id=4, claim_date=date(2024, 4, 10), claim_amount=Decimal('75.00'), status='rejected', is_closed=True)
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        self.db.session.remove()
+        self.context.pop()
+
+    def ids(self, **args):
+        query = self.filters.apply(self.Claim.query, MultiDict(args))
+        return [claim.claim_id for claim in query]
+
+    def test_equality_is_the_default_operator(self):
+        self.assertEqual(sorted(self.ids(status='pending')), [1, 3])
+
+    def test_operators_parse_values_with_the_column_type(self):
+        self.assertEqual(sorted(self.ids(**{'claim_date[gte]': '2024-02-10', 'claim_date[lt]': '2024-04-01'})), [2, 3])
+        self.assertEqual(sorted(self.ids(**{'claim_amount[gt]': '99.99'})), [1, 2, 3])
+        self.assertEqual(sorted(self.ids(**{'claim_id[in]': '4,2,9'})), [2, 4])
+        self.assertEqual(sorted(self.ids(**{'status[ne]': 'pending'})), [2, 4])
+        self.assertEqual(sorted(self.ids(is_closed='true')), [2, 4])
+
+    def test_repeated_parameters_are_all_applied(self):
+        args = MultiDict([('claim_id[ne]', '1'), ('claim_id[ne]', '3')])
+        self.assertEqual(sorted(claim.claim_id for claim in self.filters.apply(self.Claim.query, args)), [2, 4])
+
+    def test_reserved_parameters_are_left_to_other_features(self):
+        self.assertEqual(sorted(self.ids(fields='status', page='2', per_page='5', ids='1')), [1, 2, 3, 4])
+
+    def test_sort_appends_the_primary_key(self):
+        self.assertEqual(self.ids(sort='-claim_amount'), [2, 3, 1, 4])
+        self.assertEqual(self.ids(sort='status,-claim_id'), [2, 3, 1, 4])
+
+    def test_columns_outside_the_whitelist_are_rejected(self):
+        with self.assertRaisesRegex(FilterError, 'Cannot filter on notes'):
+            self.ids(notes='x')
+        with self.assertRaisesRegex(FilterError, 'Cannot sort by'):
+            self.ids(sort='notes')
+        with self.assertRaisesRegex(FilterError, 'Cannot sort by'):
+            self.ids(sort='claim_id,claim_id')
+
+    def test_unknown_operators_are_rejected(self):
+        with self.assertRaisesRegex(FilterError, 'Unknown operator like'):
+            self.ids(**{'status[like]': 'pend%'})
+
+    def test_values_of_the_wrong_type_are_rejected(self):
+        for parameter, value, expected in (('claim_id', 'abc', 'an integer'), ('claim_date[gte]', '10/02/2024', 'a YYYY-MM-DD date'),
+                                           ('claim_amount[lt]', 'lots', 'a number'), ('is_closed', 'maybe', 'true or false')):
+            with self.assertRaisesRegex(FilterError, expected):
+                self.ids(**{parameter: value})
+
+    def test_in_lists_are_bounded(self):
+        with self.assertRaisesRegex(FilterError, f'at most {MAX_IN_VALUES}'):
+            self.ids(**{'claim_id[in]': ','.join(str(value) for value in range(MAX_IN_VALUES + 1))})
+
+    def test_sort_cannot_be_combined_with_cursors(self):
+        with self.assertRaisesRegex(FilterError, 'cursor pagination'):
+            self.ids(sort='claim_date', limit='10')
+
+
+if __name__ == '__main__':
+    unittest.main()
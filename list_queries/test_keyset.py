@@ -0,0 +1,121 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import select
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from list_queries.keyset import (PaginationError, decode_cursor, encode_cursor, key_orderings, keyset_query,
+                                 keyset_result)
+
+# Row value comparison and NULLs sorting last are PostgreSQL's, so the
+# paging tests need one; the database only gets a keyset_items table.
+DATABASE_URL = os.environ.get('TEST_DATABASE_URL')
+
+
+class CursorTest(unittest.TestCase):
+    def setUp(self):
+        db = SQLAlchemy()
+
+        class Item(db.Model):
+            __tablename__ = 'keyset_items'
+            item_id = db.Column(db.Integer, primary_key=True)
+            created_at = db.Column(db.TIMESTAMP)
+
+        self.orderings = key_orderings(Item.item_id, Item.created_at)
+
+    def test_cursor_round_trips_datetimes_and_nulls(self):
+        columns = self.orderings['created_at']
+        created_at = datetime(2024, 3, 1, 12, 30, 15, 250)
+        for values in ([created_at, 7], [None, 7]):
+            cursor = encode_cursor('created_at', values)
+            self.assertEqual(decode_cursor(cursor, 'created_at', columns), values)
+
+    def test_cursor_of_another_ordering_is_rejected(self):
+        cursor = encode_cursor('item_id', [7])
+        with self.assertRaisesRegex(PaginationError, 'does not match'):
+            decode_cursor(cursor, 'created_at', self.orderings['created_at'])
+
+    def test_null_in_a_not_null_column_is_rejected(self):
+        cursor = encode_cursor('created_at', [datetime(2024, 3, 1), None])
+        with self.assertRaisesRegex(PaginationError, 'Invalid cursor'):
+            decode_cursor(cursor, 'created_at', self.orderings['created_at'])
+
+    def test_garbage_cursor_is_rejected(self):
+        with self.assertRaisesRegex(PaginationError, 'Invalid cursor'):
+            decode_cursor('not a cursor!', 'item_id', self.orderings['item_id'])
+
+    def test_unknown_ordering_and_bad_limits_are_rejected(self):
+        for args in ({'order_by': 'amount'}, {'limit': 'ten'}, {'limit': '0'}):
+            with self.assertRaises(PaginationError):
+                keyset_query(None, self.orderings, args)
+
+
+@unittest.skipUnless(DATABASE_URL, 'set TEST_DATABASE_URL to a PostgreSQL database')
+class NullPagingTest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL
+        self.db = db = SQLAlchemy(self.app)
+
+        class Item(db.Model):
+            __tablename__ = 'keyset_items'
+            item_id = db.Column(db.Integer, primary_key=True)
+            created_at = db.Column(db.TIMESTAMP)
+
+        self.Item = Item
+        self.orderings = key_orderings(Item.item_id, Item.created_at)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.drop_all()
+        db.create_all()
+        # Every third row has no created_at; the others share timestamps in pairs.
+        start = datetime(2024, 1, 1)
+        db.session.add_all(Item(item_id=item_id, created_at=None if item_id % 3 == 0 else start + timedelta(days=item_id // 2))
+                           for item_id in range(1, 31))
+        db.session.commit()
+
+    def tearDown(self):
+        self.db.session.remove()
+        self.db.drop_all()
+        self.context.pop()
+
+    def walk(self, query, run, limit):
+        ids = []
+        args = {'order_by': 'created_at', 'limit': str(limit)}
+        while True:
+            page_query, ordering, columns, page_limit = keyset_query(query, self.orderings, args)
+            page = keyset_result(run(page_query), ordering, columns, page_limit, lambda row: row.item_id, 'items')
+            ids += page['items']
+            if not page['next_cursor']:
+                return ids
+            args = dict(args, after=page['next_cursor'])
+
+    def expected(self):
+        rows = self.Item.query.all()
+        dated = sorted((row.created_at, row.item_id) for row in rows if row.created_at is not None)
+        return [item_id for _, item_id in dated] + sorted(row.item_id for row in rows if row.created_at is None)
+
+    def test_orm_pages_cross_into_the_nulls(self):
+        for limit in (1, 4, 7, 30, 50):
+            self.assertEqual(self.walk(self.Item.query, lambda query: query.all(), limit), self.expected())
+
+    def test_core_pages_cross_into_the_nulls(self):
+        statement = select(self.Item.item_id, self.Item.created_at)
+        run = lambda query: self.db.session.execute(query).all()
+        for limit in (1, 4, 7, 30, 50):
+            self.assertEqual(self.walk(statement, run, limit), self.expected())
+
+    def test_null_cursor_continues_among_the_nulls(self):
+        args = {'order_by': 'created_at', 'limit': '2', 'after': encode_cursor('created_at', [None, 9])}
+        page_query, ordering, columns, limit = keyset_query(self.Item.query, self.orderings, args)
+        page = keyset_result(page_query.all(), ordering, columns, limit, lambda row: row.item_id, 'items')
+        self.assertEqual(page['items'], [12, 15])
+        self.assertEqual(decode_cursor(page['next_cursor'], 'created_at', columns), [None, 15])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import sys
+import unittest
+from unittest import mock
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from json_encoding.encoder import ModelEncoder
+from list_queries.filters import FilterError
+from list_queries.multiget import MULTIGET_MAX_IDS, IdLookup
+
+
+class IdLookupTest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        self.db = db = SQLAlchemy(self.app)
+
+        class Contact(db.Model):
+            __tablename__ = 'contacts'
+            contact_id = db.Column(db.Integer, primary_key=True)
+            contact_name = db.Column(db.String(100), nullable=False)
+            phone_number = db.Column(db.String(20))
+
+        self.Contact = Contact
+        self.encoder = ModelEncoder(Contact)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        db.session.add_all(Contact(contact_id=contact_id, contact_name=f'Contact {contact_id}', phone_number=f'07{contact_id:08d}')
+                           for contact_id in range(1, 6))
+        db.session.commit()
+        self.selects = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda connection, cursor, statement, *args: self.selects.append(statement) if statement.startswith('SELECT') else None)
+        self.clock = mock.patch('list_queries.multiget.time.monotonic', return_value=1000.0)
+        self.now = self.clock.start()
+
+    def tearDown(self):
+        self.clock.stop()
+        self.db.session.remove()
+        self.context.pop()
+
+    def get(self, lookup, query_string):
+        with self.app.test_request_context('/contacts?' + query_string):
+            return lookup.get_many(self.Contact.query, self.encoder.requested_fields())
+
+    def rename(self, contact_id, name):
+        self.db.session.get(self.Contact, contact_id).contact_name = name
+        self.db.session.commit()
+        self.selects.clear()
+
+    def test_rows_come_back_in_the_requested_order_without_unknown_ids(self):
+        rows = self.get(IdLookup(self.encoder, self.Contact.contact_id), 'ids=3,1,99,3')
+        self.assertEqual([row['contact_id'] for row in rows], [3, 1])
+        self.assertEqual(rows[0], {'contact_id': 3, 'contact_name': 'Contact 3', 'phone_number': '0700000003'})
+
+    def test_cached_rows_are_not_read_again_and_fields_apply_to_them(self):
+        lookup = IdLookup(self.encoder, self.Contact.contact_id)
+        self.get(lookup, 'ids=1,2')
+        self.assertEqual(len(self.selects), 1)
+        rows = self.get(lookup, 'ids=2,1,3&fields=contact_name')
+        self.assertEqual(rows, [{'contact_name': 'Contact 2'}, {'contact_name': 'Contact 1'}, {'contact_name': 'Contact 3'}])
+        # Only id 3 was missing, and all of it was read with one IN query.
+        self.assertEqual(len(self.selects), 2)
+        self.assertIn(' IN ', self.selects[-1])
+
+    def test_rows_expire_after_the_ttl(self):
+        lookup = IdLookup(self.encoder, self.Contact.contact_id, ttl=30)
+        self.get(lookup, 'ids=1')
+        self.rename(1, 'Renamed')
+        self.now.return_value = 1029.0
+        self.assertEqual(self.get(lookup, 'ids=1')[0]['contact_name'], 'Contact 1')
+        self.now.return_value = 1030.0
+        self.assertEqual(self.get(lookup, 'ids=1')[0]['contact_name'], 'Renamed')
+
+    def test_forget_drops_the_cached_row(self):
+        lookup = IdLookup(self.encoder, self.Contact.contact_id)
+        self.get(lookup, 'ids=1,2')
+        self.rename(1, 'Renamed')
+        lookup.forget(1)
+        lookup.forget(42)
+        rows = self.get(lookup, 'ids=1,2')
+        self.assertEqual([row['contact_name'] for row in rows], ['Renamed', 'Contact 2'])
+        self.assertEqual(len(self.selects), 1)
+
+    def test_least_recently_used_rows_are_evicted(self):
+        lookup = IdLookup(self.encoder, self.Contact.contact_id, size=2)
+        self.get(lookup, 'ids=1,2')
+        self.get(lookup, 'ids=1')
+        self.get(lookup, 'ids=3')
+        self.selects.clear()
+        self.get(lookup, 'ids=1,3')
+        self.assertEqual(self.selects, [])
+        self.get(lookup, 'ids=2')
+        self.assertEqual(len(self.selects), 1)
+
+    def test_bad_id_lists_are_rejected(self):
+        lookup = IdLookup(self.encoder, self.Contact.contact_id)
+        too_many = ','.join(str(value) for value in range(MULTIGET_MAX_IDS + 1))
+        for query_string, message in (('ids=1,a', 'comma separated list of integers'), ('ids=' + too_many, 'at most'),
+                                      ('ids=1&contact_name=x', 'only be combined with fields')):
+            with self.assertRaisesRegex(FilterError, message):
+                self.get(lookup, query_string)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import os
+import re
+from sqlalchemy import text
+
+
+# Rows per table at scale 1; every count is multiplied by the scale.
+VOLUMES = {
+    'users': 2000,
+    'insured': 2000,
+    'policytypes': 10,
+    'coveragetypes': 10,
+    'policies': 4000,
+    'claims': 20000,
+    'payments': 48000,
+    'beneficiaries': 4000,
+    'addresses': 2000,
+    'contacts': 2000,
+    'documents': 8000,
+    'supporttickets': 4000,
+    'insurancerequests': 2000,
+    'insuranceproposals': 2000
+}
+
+AGE_BANDS = ('18-25', '26-35', '36-45', '46-55', '56-65', '66+')
+
+SCHEMA_SCRIPT = os.path.join(os.path.dirname(__file__), '..', 'serviciu_baza_de_date', 'script.sql')
+
+# The statements of script.sql that create_all() leaves out: extensions,
+# secondary indexes and the columns the models do not declare, such as the
+# generated search_vector columns.
+SCRIPT_DDL_PATTERN = re.compile(r'^(?:CREATE EXTENSION|CREATE INDEX \w+ ON (\w+)|'
+                                r'ALTER TABLE (?:\w+\.)?(\w+) ADD (?:COLUMN )?"?(\w+))', re.I)
+
+# Every value is a function of the row number g, so a given scale always
+# produces the same rows. Foreign keys wrap around the referenced table.
+SEED_STATEMENTS = {
+    'users': """INSERT INTO asiguraez.users (username, email, password, created_at, updated_at, role, is_active)
+        SELECT 'user' || g, 'user' || g || '@example.ro', :password, timestamp '2023-01-01' + g * interval '17 minutes',
+               timestamp '2023-01-01' + g * interval '17 minutes', (ARRAY['user', 'admin', 'visitor'])[1 + g % 3], g % 20 <> 0
+        FROM generate_series(1, :users) g""",
+    'insured': """INSERT INTO asiguraez.insured (user_id, first_name, last_name, date_of_birth, gender, occupation,
+                                                  marital_status, created_at, updated_at)
+        SELECT g, (ARRAY['Ion', 'Maria', 'Andrei', 'Elena', 'Mihai', 'Ana', 'Radu', 'Ioana'])[1 + g % 8],
+               (ARRAY['Popescu', 'Ionescu', 'Popa', 'Stan', 'Dumitru', 'Stoica', 'Gheorghe'])[1 + g % 7],
+               date '1945-01-01' + (g * 7919) % 21900, (ARRAY['M', 'F'])[1 + g % 2], 'Engineer',
+               (ARRAY['single', 'married', 'divorced'])[1 + g % 3],
+               timestamp '2023-01-01' + g * interval '17 minutes', timestamp '2023-01-01' + g * interval '17 minutes'
+        FROM generate_series(1, :insured) g""",
+    'policytypes': """INSERT INTO asiguraez.policytypes (type_name, description)
+        SELECT 'Policy type ' || g, 'Seeded policy type' FROM generate_series(1, :policytypes) g""",
+    'coveragetypes': """INSERT INTO asiguraez.coveragetypes (coverage_name, description)
+        SELECT 'Coverage ' || g, 'Seeded coverage' FROM generate_series(1, :coveragetypes) g""",
+    'policies': """INSERT INTO asiguraez.policies (policy_name, description, coverage_amount, premium_amount, created_at,
+                                                   updated_at, policy_type_id, insured_id)
+        SELECT 'Policy ' || g, 'Seeded policy', (10 + g % 490) * 1000, 100 + (g * 37) % 2900,
+               timestamp '2023-01-01' + g * interval '9 minutes', timestamp '2023-01-01' + g * interval '9 minutes',
+               1 + g % :policytypes, 1 + g % :insured
+        FROM generate_series(1, :policies) g""",
+    'claims': """INSERT INTO asiguraez.claims (policy_id, claim_date, claim_amount, status, created_at)
+        SELECT 1 + (g * 7) % :policies, date '2023-01-01' + g % 730, 100 + (g * 131) % 49900,
+               (ARRAY['pending', 'approved', 'rejected'])[1 + g % 3], timestamp '2023-01-01' + g * interval '2 minutes'
+        FROM generate_series(1, :claims) g""",
+    'payments': """INSERT INTO asiguraez.payments (policy_id, payment_date, amount, status, created_at)
+        SELECT 1 + g % :policies, date '2023-01-01' + (g / :policies) * 30, 50 + (g * 17) % 1950,
+               (ARRAY['paid', 'paid', 'paid', 'pending', 'failed'])[1 + g % 5], timestamp '2023-01-01' + g * interval '1 minute'
+        FROM generate_series(1, :payments) g""",
+    'beneficiaries': """INSERT INTO asiguraez.beneficiaries (policy_id, beneficiary_name, relationship, created_at)
+        SELECT 1 + g % :policies, 'Beneficiary ' || g, (ARRAY['spouse', 'child', 'parent'])[1 + g % 3],
+               timestamp '2023-01-01' + g * interval '9 minutes'
+        FROM generate_series(1, :beneficiaries) g""",
+    'addresses': """INSERT INTO asiguraez.addresses (insured_id, address_type, street_address, city, state, zip_code,
+                                                     created_at, updated_at)
+        SELECT 1 + g % :insured, (ARRAY['home', 'work'])[1 + g % 2], 'Strada ' || g, (ARRAY['Cluj', 'Iasi', 'Brasov'])[1 + g % 3],
+               'RO', lpad((g * 7919 % 1000000)::text, 6, '0'), timestamp '2023-01-01' + g * interval '17 minutes',
+               timestamp '2023-01-01' + g * interval '17 minutes'
+        FROM generate_series(1, :addresses) g""",
+    'contacts': """INSERT INTO asiguraez.contacts (insured_id, contact_name, relationship, phone_number, created_at)
+        SELECT 1 + g % :insured, 'Contact ' || g, (ARRAY['spouse', 'parent', 'friend'])[1 + g % 3],
+               '07' || lpad((g * 104729 % 100000000)::text, 8, '0'), timestamp '2023-01-01' + g * interval '17 minutes'
+        FROM generate_series(1, :contacts) g""",
+    'documents': """INSERT INTO asiguraez.documents (policy_id, document_type, file_path, created_at)
+        SELECT 1 + g % :policies, (ARRAY['contract', 'invoice', 'id_card', 'claim_form'])[1 + g % 4],
+               '/documents/' || g || '.pdf', timestamp '2023-01-01' + g * interval '4 minutes'
+        FROM generate_series(1, :documents) g""",
+    'supporttickets': """INSERT INTO asiguraez.supporttickets (user_id, subject, description, status, priority, assigned_to,
+                                                               created_at, updated_at)
+        SELECT 1 + g % :users, 'Ticket ' || g, 'Seeded ticket description ' || g, (ARRAY['open', 'closed'])[1 + g % 2],
+               (ARRAY['low', 'medium', 'high'])[1 + g % 3], 1 + (g * 7) % :users,
+               timestamp '2023-01-01' + g * interval '9 minutes', timestamp '2023-01-01' + g * interval '9 minutes'
+        FROM generate_series(1, :supporttickets) g""",
+    'insurancerequests': """INSERT INTO asiguraez.insurancerequests (user_id, policy_type_id, coverage_amount, request_date, status)
+        SELECT 1 + g % :users, 1 + g % :policytypes, (10 + g % 490) * 1000, timestamp '2023-01-01' + g * interval '17 minutes',
+               (ARRAY['pending', 'approved', 'rejected'])[1 + g % 3]
+        FROM generate_series(1, :insurancerequests) g""",
+    'insuranceproposals': """INSERT INTO asiguraez.insuranceproposals (employee_id, insured_id, policy_type_id, coverage_amount,
+                                                                       premium_amount, proposal_date, status)
+        SELECT 1 + g % :users, 1 + g % :insured, 1 + g % :policytypes, (10 + g % 490) * 1000, 100 + (g * 37) % 2900,
+               timestamp '2023-01-01' + g * interval '17 minutes', (ARRAY['sent', 'accepted', 'declined'])[1 + g % 3]
+        FROM generate_series(1, :insuranceproposals) g""",
+    'premiumrates': """INSERT INTO asiguraez.premiumrates (policy_id, coverage_id, age_range, rate_amount, created_at)
+        SELECT p, c, band.age_range, 1 + (p * 3 + c * 5 + band.position) % 20, timestamp '2023-01-01'
+        FROM generate_series(1, least(:policies, 100)) p, generate_series(1, least(:coveragetypes, 3)) c,
+             unnest(CAST(:age_bands AS text[])) WITH ORDINALITY AS band(age_range, position)"""
+}
+
+
+def seed_counts(scale):
+    counts = {table: max(1, int(rows * scale)) for table, rows in VOLUMES.items()}
+    counts['premiumrates'] = min(counts['policies'], 100) * min(counts['coveragetypes'], 3) * len(AGE_BANDS)
+    return counts
+
+
+def stored_counts(engine):
+    """Row counts of the seeded tables as they are now, e.g. after load_testing.datagen."""
+    with engine.connect() as connection:
+        return {table: max(1, connection.execute(text(f'SELECT count(*) FROM asiguraez.{table}')).scalar())
+                for table in seed_counts(1)}
+
+
+def recreate(engine, metadata):
+    with engine.begin() as connection:
+        connection.execute(text('CREATE SCHEMA IF NOT EXISTS asiguraez'))
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+
+def script_ddl(metadata):
+    """Yield the DDL of script.sql that create_all(metadata) does not cover, in script order."""
+    columns = {table.name: {column.name for column in table.columns} for table in metadata.tables.values()}
+    with open(SCHEMA_SCRIPT) as file:
+        script = re.sub(r'--[^\n]*', '', file.read())
+    for statement in script.split(';'):
+        statement = ' '.join(statement.split())
+        match = SCRIPT_DDL_PATTERN.match(statement)
+        if not match:
+            continue
+        table = (match.group(1) or match.group(2) or '').lower()
+        if table and table not in columns:
+            continue
+        column = (match.group(3) or '').lower()
+        if column and (column == 'constraint' or column in columns[table]):
+            continue
+        yield statement
+
+
+def apply_script_ddl(engine, metadata):
+    """Bring the recreated tables up to the production schema, once they are loaded."""
+    with engine.begin() as connection:
+        connection.execute(text('SET LOCAL search_path TO asiguraez, public'))
+        for statement in script_ddl(metadata):
+            if statement.upper().startswith('CREATE EXTENSION'):
+                # Into public, where the services' connections look up functions such as similarity().
+                statement += ' SCHEMA public'
+            connection.exec_driver_sql(statement)
+
+
+def analyze(engine, tables):
+    with engine.begin() as connection:
+        for table in tables:
+            connection.execute(text(f'ANALYZE asiguraez.{table}'))
+
+
+def seed(engine, metadata, scale=1.0, password_hash=''):
+    """Recreate every table in `metadata` and fill it with seed_counts(scale) rows.
+
+    The indexes and generated columns of script.sql are added after the
+    rows, so the services are measured on the production schema. Returns
+    the row counts, which the workloads use to pick existing ids.
+    """
+    counts = seed_counts(scale)
+    recreate(engine, metadata)
+    parameters = dict(counts, password=password_hash, age_bands=list(AGE_BANDS))
+    with engine.begin() as connection:
+        for table, statement in SEED_STATEMENTS.items():
+            connection.execute(text(statement), parameters)
+    apply_script_ddl(engine, metadata)
+    analyze(engine, counts)
+    return counts
@@ -0,0 +1,35 @@
+"""Serve one service for a load test: python -m load_testing.serve claims --port 5100
+
+The service's blueprint is mounted through create_service_app, as its own
+create_app() would, but against DATABASE_URL and with the rate limits off
+unless LOADTEST_RATE_LIMITS=true, so the writes being measured are not
+turned into 429s.
+"""
+import argparse
+from importlib import import_module
+from os import environ
+from werkzeug.serving import run_simple
+
+from hosting.service_app import create_service_app
+
+
+def create_app(service):
+    module = f'serviciu_{service}.app'
+    return create_service_app(module, [import_module(module).bp], {
+        'SQLALCHEMY_DATABASE_URI': environ['DATABASE_URL'],
+        'SECRET_KEY': environ.get('SECRET_KEY', 'cheie_secreta'),
+        'RATELIMIT_ENABLED': environ.get('LOADTEST_RATE_LIMITS', 'false').lower() in ('1', 'true', 'yes')
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5100)
+    args = parser.parse_args()
+    run_simple(args.host, args.port, create_app(args.service), threaded=True)
+
+
+if __name__ == '__main__':
+    main()
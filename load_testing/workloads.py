@@ -0,0 +1,144 @@
+from collections import namedtuple
+from urllib.parse import quote
+
+
+# `path` and `body` are called with (rng, counts): the worker's random.Random
+# and the row counts the database was seeded with, so ids stay in range.
+Operation = namedtuple('Operation', 'name weight method path body')
+
+def random_id(table):
+    return lambda rng, counts: rng.randint(1, counts[table])
+
+def unique_name(prefix, rng):
+    return f'{prefix}-{rng.getrandbits(48):012x}'
+
+def list_page(path, limit=50):
+    return Operation(f'GET {path}?limit={limit}', 30, 'GET', lambda rng, counts: f'{path}?limit={limit}', None)
+
+def get_one(path, table):
+    return Operation(f'GET {path}/<id>', 45, 'GET', lambda rng, counts: f'{path}/{random_id(table)(rng, counts)}', None)
+
+def create(path, body, weight=10):
+    return Operation(f'POST {path}', weight, 'POST', lambda rng, counts: path, body)
+
+def update(path, table, body, weight=5):
+    return Operation(f'PUT {path}/<id>', weight, 'PUT',
+                     lambda rng, counts: f'{path}/{random_id(table)(rng, counts)}', body)
+
+def claim_body(rng, counts):
+    return {'policy_id': random_id('policies')(rng, counts), 'claim_date': f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+            'claim_amount': f'{rng.uniform(100, 50000):.2f}', 'status': rng.choice(('pending', 'approved', 'rejected'))}
+
+def payment_body(rng, counts):
+    return {'policy_id': random_id('policies')(rng, counts), 'payment_date': f'2024-{rng.randint(1, 12):02d}-01',
+            'amount': f'{rng.uniform(50, 2000):.2f}', 'status': rng.choice(('paid', 'pending', 'failed'))}
+
+def policy_body(rng, counts):
+    return {'policy_name': unique_name('policy', rng), 'description': 'Load test policy',
+            'coverage_amount': f'{rng.randint(10, 500) * 1000:.2f}', 'premium_amount': f'{rng.uniform(100, 3000):.2f}',
+            'policy_type_id': random_id('policytypes')(rng, counts), 'insured_id': random_id('insured')(rng, counts)}
+
+def insured_body(rng, counts):
+    return {'user_id': None, 'first_name': rng.choice(('Ion', 'Maria', 'Andrei', 'Elena', 'Mihai', 'Ana')),
+            'last_name': rng.choice(('Popescu', 'Ionescu', 'Popa', 'Stan', 'Dumitru')),
+            'date_of_birth': f'{rng.randint(1940, 2005)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+            'gender': rng.choice(('M', 'F')), 'occupation': 'Engineer', 'marital_status': 'single'}
+
+def address_body(rng, counts):
+    return {'insured_id': random_id('insured')(rng, counts), 'address_type': rng.choice(('home', 'work')),
+            'street_address': f'Strada Lunga {rng.randint(1, 200)}', 'city': rng.choice(('Cluj', 'Iasi', 'Brasov')),
+            'state': 'RO', 'zip_code': f'{rng.randint(100000, 999999)}'}
+
+def ticket_body(rng, counts):
+    return {'user_id': random_id('users')(rng, counts), 'subject': 'Payment not registered',
+            'description': 'My last payment does not show up on the policy.', 'status': rng.choice(('open', 'closed')),
+            'priority': rng.choice(('low', 'medium', 'high')), 'assigned_to': random_id('users')(rng, counts)}
+
+def request_body(rng, counts):
+    return {'user_id': random_id('users')(rng, counts), 'policy_type_id': random_id('policytypes')(rng, counts),
+            'coverage_amount': f'{rng.randint(10, 500) * 1000:.2f}', 'status': 'pending'}
+
+def proposal_body(rng, counts):
+    return dict(request_body(rng, counts), employee_id=random_id('users')(rng, counts),
+                insured_id=random_id('insured')(rng, counts), premium_amount=f'{rng.uniform(100, 3000):.2f}')
+
+def premium_rate_body(rng, counts):
+    # The seeded policies end with an open 66+ band, so new rates go to the
+    # others, one age at a time below rate_matrix.AGE_SPAN to rarely collide.
+    rated = min(counts['policies'], 100)
+    return {'policy_id': rng.randint(min(rated + 1, counts['policies']), counts['policies']),
+            'coverage_id': random_id('coveragetypes')(rng, counts), 'age_range': str(rng.randint(0, 1023)), 'rate_amount': f'{rng.uniform(1, 20):.2f}'}
+
+def policies_page_path(rng, counts):
+    # paginate() answers pages past the last one with a 404.
+    return f'/policies?page={rng.randint(1, max(1, min(counts["policies"] // 50, 20)))}&per_page=50'
+
+def rated_pair(rng, counts):
+    # load_testing.seed rates the first 100 policies for the first 3 coverages.
+    return rng.randint(1, min(counts['policies'], 100)), rng.randint(1, min(counts['coveragetypes'], 3))
+
+def quote_body(rng, counts):
+    return [dict(zip(('policy_id', 'coverage_id'), rated_pair(rng, counts)),
+                 age=rng.randint(18, 90), coverage_amount=rng.randint(10, 500) * 1000) for _ in range(100)]
+
+def rate_lookup_path(rng, counts):
+    policy_id, coverage_id = rated_pair(rng, counts)
+    return f'/premium_rates/lookup?policy_id={policy_id}&coverage_id={coverage_id}&age={rng.randint(18, 90)}'
+
+# Names and words found in both load_testing.seed and load_testing.datagen
+# rows, with misspellings that only the trigram index matches.
+INSURED_SEARCHES = ('Popescu', 'Maria', 'Elena Ionescu', 'Andrei Popa', 'Popesku', 'Ionesku Maria', 'Dumitr')
+TICKET_SEARCHES = ('payment', 'ticket', 'claim status', 'policy -cancel')
+
+def search_path(rng, counts):
+    return f'/search?q={quote(rng.choice(INSURED_SEARCHES + TICKET_SEARCHES))}'
+
+def ticket_search_path(rng, counts):
+    return f'/search?type=support_tickets&q={quote(rng.choice(TICKET_SEARCHES))}&page={rng.randint(1, 3)}'
+
+
+# Mixed read/write workloads, keyed by service (the serviciu_<name> directory).
+WORKLOADS = {
+    'addresses': [list_page('/addresses'), get_one('/addresses', 'addresses'), create('/addresses', address_body),
+                  update('/addresses', 'addresses', address_body)],
+    'beneficiaries': [list_page('/beneficiaries'), get_one('/beneficiaries', 'beneficiaries'),
+                      create('/beneficiaries', lambda rng, counts: {'policy_id': random_id('policies')(rng, counts),
+                                                                    'beneficiary_name': 'Ana Pop', 'relationship': 'child'})],
+    'claims': [list_page('/claims'), get_one('/claims', 'claims'), create('/claims', claim_body),
+               update('/claims', 'claims', lambda rng, counts: {'status': rng.choice(('approved', 'rejected'))}),
+               Operation('GET /claims/aggregate', 5, 'GET', lambda rng, counts: '/claims/aggregate?group_by=month', None)],
+    'contacts': [list_page('/contacts'), get_one('/contacts', 'contacts'),
+                 create('/contacts', lambda rng, counts: {'insured_id': random_id('insured')(rng, counts), 'contact_name': 'Dan Pop',
+                                                          'relationship': 'spouse', 'phone_number': f'07{rng.randint(10000000, 99999999)}'})],
+    'coverage_types': [list_page('/coverage_types'), get_one('/coverage_types', 'coveragetypes'),
+                       create('/coverage_types', lambda rng, counts: {'coverage_name': unique_name('coverage', rng)}, weight=2)],
+    'documents': [list_page('/documents'), get_one('/documents', 'documents'),
+                  create('/documents', lambda rng, counts: {'policy_id': random_id('policies')(rng, counts),
+                                                            'document_type': 'contract', 'file_path': '/docs/contract.pdf'})],
+    'insurance_proposals': [list_page('/insurance_proposals'), get_one('/insurance_proposals', 'insuranceproposals'),
+                            create('/insurance_proposals', proposal_body)],
+    'insurance_requests': [list_page('/insurance_requests'), get_one('/insurance_requests', 'insurancerequests'),
+                           create('/insurance_requests', request_body)],
+    'insureds': [list_page('/insured'), get_one('/insured', 'insured'), create('/insured', insured_body)],
+    'payments': [list_page('/payments'), get_one('/payments', 'payments'), create('/payments', payment_body),
+                 update('/payments', 'payments', lambda rng, counts: {'status': 'paid'})],
+    'policies': [Operation('GET /policies?page=<n>', 30, 'GET', policies_page_path, None),
+                 get_one('/policies', 'policies'), create('/policies', policy_body),
+                 Operation('GET /policies/<id>/full', 10, 'GET',
+                           lambda rng, counts: f'/policies/{random_id("policies")(rng, counts)}/full', None),
+                 update('/policies', 'policies', policy_body)],
+    'policy_types': [list_page('/policytypes'), get_one('/policytypes', 'policytypes'),
+                     create('/policytypes', lambda rng, counts: {'type_name': unique_name('type', rng)}, weight=2)],
+    'premium_rates': [list_page('/premium_rates'), get_one('/premium_rates', 'premiumrates'),
+                      Operation('GET /premium_rates/lookup', 20, 'GET', rate_lookup_path, None),
+                      Operation('POST /premium_rates/quote', 5, 'POST', lambda rng, counts: '/premium_rates/quote', quote_body),
+                      create('/premium_rates', premium_rate_body, weight=2)],
+    'search': [Operation('GET /search?q=<term>', 70, 'GET', search_path, None),
+               Operation('GET /search?type=support_tickets', 30, 'GET', ticket_search_path, None)],
+    'support_tickets': [list_page('/support_tickets'), get_one('/support_tickets', 'supporttickets'),
+                        create('/support_tickets', ticket_body),
+                        update('/support_tickets', 'supporttickets', lambda rng, counts: {'status': 'closed'})],
+    'users': [list_page('/users'), get_one('/users', 'users'),
+              create('/users', lambda rng, counts: {'username': 'load', 'email': f'{unique_name("user", rng)}@example.ro',
+                                                    'password': 'secret1', 'role': 'user'}, weight=2)]
+}
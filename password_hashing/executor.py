@@ -0,0 +1,61 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore
+from prometheus_client import Counter, Histogram
+
+
+HASH_SECONDS = Histogram('password_hash_seconds', 'Time spent hashing or verifying a password',
+                         ['operation'])
+HASH_REJECTED = Counter('password_hash_rejected_total',
+                        'Password operations refused because the hashing pool was saturated',
+                        ['operation'])
+
+
+class HashingSaturated(RuntimeError):
+    pass
+
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated thread pool.
+
+    bcrypt releases the GIL while it works, so at most `workers` hashes
+    burn CPU at once and the request threads serving everything else keep
+    running. Up to `queue_depth` more callers may wait for a free thread;
+    anyone beyond that gets HashingSaturated straight away, which the
+    views turn into a 503.
+    """
+
+    def __init__(self, bcrypt, workers=2, queue_depth=8):
+        self.bcrypt = bcrypt
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = BoundedSemaphore(workers + queue_depth)
+
+    def hash(self, password):
+        return self._run('hash', self._hash, password)
+
+    def check(self, password_hash, password):
+        return self._run('check', self.bcrypt.check_password_hash, password_hash, password)
+
+    def _hash(self, password):
+        return self.bcrypt.generate_password_hash(password).decode('utf-8')
+
+    def _run(self, operation, func, *args):
+        if not self._slots.acquire(blocking=False):
+            HASH_REJECTED.labels(operation).inc()
+            raise HashingSaturated('Too many password operations in progress')
+        try:
+            future = self._executor.submit(self._timed, operation, func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until bcrypt finishes, even if the caller gives up.
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    @staticmethod
+    def _timed(operation, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            HASH_SECONDS.labels(operation).observe(time.perf_counter() - start)
@@ -0,0 +1,167 @@
+import time
+from bisect import bisect_right
+from collections import namedtuple
+from threading import Lock
+from premium_quoting.rate_matrix import parse_age_range
+
+
+RateInterval = namedtuple('RateInterval', ['low', 'high', 'rate_id', 'age_range', 'rate_amount'])
+
+
+class AgeRangeIndex:
+    """Parsed age ranges per (policy_id, coverage_id), kept sorted for bisect.
+
+    Every group holds its intervals ordered by lower bound, alongside a
+    tuple of those bounds, so lookup() is a single bisect_right. Since
+    writes reject overlaps, the interval with the highest lower bound at or
+    below an age is the only one that can contain it.
+
+    Groups are immutable tuples: put() and remove() build a new group and
+    swap it in, so lookup() reads without taking the lock. The whole index
+    is reloaded from `load_rows` once it is `ttl` seconds old, which picks
+    up rates written by other workers. The first caller to find it stale
+    rebuilds it outside the lock while every other caller keeps reading the
+    old groups; groups written meanwhile are carried over on the swap.
+    """
+
+    def __init__(self, load_rows, ttl=60):
+        self.load_rows = load_rows
+        self.ttl = ttl
+        self._groups = None
+        self._group_of = {}
+        self._loaded_at = 0.0
+        self._written = None
+        self._lock = Lock()
+        self._reload_lock = Lock()
+
+    def lookup(self, policy_id, coverage_id, age):
+        lows, intervals = self._current().get((policy_id, coverage_id), ((), ()))
+        position = bisect_right(lows, age) - 1
+        if position >= 0 and age <= intervals[position].high:
+            return intervals[position]
+        return None
+
+    def overlapping(self, policy_id, coverage_id, low, high, rows, exclude_rate_id=None):
+        """The interval of the group that [low, high] overlaps, or None.
+
+        `rows` are the group's current rows from the database. They replace
+        the group in the index first, so the check never trusts rates that
+        another worker has since changed.
+        """
+        self._current()
+        with self._lock:
+            self._replace_group((policy_id, coverage_id), rows)
+            lows, intervals = self._groups.get((policy_id, coverage_id), ((), ()))
+        position = bisect_right(lows, high) - 1
+        while position >= 0:
+            interval = intervals[position]
+            if interval.rate_id != exclude_rate_id:
+                return interval if interval.high >= low else None
+            position -= 1
+        return None
+
+    def put(self, rate_id, policy_id, coverage_id, age_range, rate_amount):
+        low, high = parse_age_range(age_range)
+        with self._lock:
+            if self._groups is None:
+                return
+            self._discard(rate_id)
+            key = (policy_id, coverage_id)
+            lows, intervals = self._groups.get(key, ((), ()))
+            position = bisect_right(lows, low)
+            interval = RateInterval(low, high, rate_id, age_range, rate_amount)
+            self._set_group(key, lows[:position] + (low,) + lows[position:],
+                            intervals[:position] + (interval,) + intervals[position:])
+            self._group_of[rate_id] = key
+
+    def remove(self, rate_id):
+        with self._lock:
+            if self._groups is not None:
+                self._discard(rate_id)
+
+    def _current(self):
+        """The groups to read, reloaded first by this caller if they are stale and no one else is at it."""
+        groups = self._groups
+        if groups is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return groups
+        if groups is None:
+            # Nothing to serve yet, so wait for whoever is loading.
+            with self._reload_lock:
+                if self._groups is None:
+                    self._reload()
+            return self._groups
+        if self._reload_lock.acquire(blocking=False):
+            try:
+                if time.monotonic() - self._loaded_at >= self.ttl:
+                    self._reload()
+            finally:
+                self._reload_lock.release()
+        return self._groups
+
+    def _reload(self):
+        with self._lock:
+            self._written = set()
+        try:
+            rows_by_group = {}
+            for row in self.load_rows():
+                rows_by_group.setdefault((row.policy_id, row.coverage_id), []).append(row)
+            groups, group_of = {}, {}
+            for key, rows in rows_by_group.items():
+                group = _build_group(rows)
+                if group:
+                    groups[key] = group
+                    group_of.update((interval.rate_id, key) for interval in group[1])
+            with self._lock:
+                # Writes made while loading may be missing from the rows; keep their groups as written.
+                for key in self._written:
+                    for interval in groups.pop(key, ((), ()))[1]:
+                        group_of.pop(interval.rate_id, None)
+                    if self._groups and key in self._groups:
+                        groups[key] = self._groups[key]
+                        group_of.update((interval.rate_id, key) for interval in groups[key][1])
+                self._groups, self._group_of = groups, group_of
+                self._loaded_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._written = None
+
+    def _set_group(self, key, lows, intervals):
+        if intervals:
+            self._groups[key] = (lows, intervals)
+        else:
+            self._groups.pop(key, None)
+        if self._written is not None:
+            self._written.add(key)
+
+    def _replace_group(self, key, rows):
+        for interval in self._groups.get(key, ((), ()))[1]:
+            self._group_of.pop(interval.rate_id, None)
+        lows, intervals = _build_group(rows) or ((), ())
+        self._set_group(key, lows, intervals)
+        self._group_of.update((interval.rate_id, key) for interval in intervals)
+
+    def _discard(self, rate_id):
+        key = self._group_of.pop(rate_id, None)
+        if key is None:
+            return
+        lows, intervals = self._groups[key]
+        for position, interval in enumerate(intervals):
+            if interval.rate_id == rate_id:
+                self._set_group(key, lows[:position] + lows[position + 1:], intervals[:position] + intervals[position + 1:])
+                break
+
+
+def _build_group(rows):
+    """The (lows, intervals) tuples of one group's rows, or None if none of them parse."""
+    intervals = []
+    for row in rows:
+        try:
+            low, high = parse_age_range(row.age_range)
+        except ValueError:
+            # Rows stored before ranges were validated; they can never match.
+            continue
+        intervals.append(RateInterval(low, high, row.rate_id, row.age_range, row.rate_amount))
+    if not intervals:
+        return None
+    intervals.sort()
+    return tuple(interval.low for interval in intervals), tuple(intervals)
@@ -0,0 +1,199 @@
+import re
+import time
+from datetime import datetime
+from threading import Lock
+import numpy as np
+
+
+# Ages are packed next to the group number in one sortable int64 key, so
+# every age must fit below AGE_SPAN.
+AGE_SPAN = 1024
+
+# policy_id and coverage_id are packed into one int64 by _pair(), 32 bits
+# each; as INT columns they never go past this anyway.
+MAX_ID = 2 ** 31 - 1
+
+AGE_RANGE_PATTERN = re.compile(r'^\s*(\d+)\s*(?:(\+)|[-–]\s*(\d+))?\s*$')
+
+
+class QuoteError(ValueError):
+    pass
+
+
+def parse_age_range(age_range):
+    """Return the inclusive (low, high) ages of '18-25', '65+' or '40'; high is inf for '65+'."""
+    match = AGE_RANGE_PATTERN.match(age_range) if isinstance(age_range, str) else None
+    if not match:
+        raise ValueError(f'Malformed age range {age_range!r}')
+    low = int(match.group(1))
+    if match.group(2):
+        high = float('inf')
+    else:
+        high = int(match.group(3) or low)
+    if high < low or low >= AGE_SPAN:
+        raise ValueError(f'Malformed age range {age_range!r}')
+    return low, high
+
+
+def parse_id(value, name):
+    """`value` as a policy or coverage id between 0 and MAX_ID; bools and fractions are rejected."""
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(f'{name} must be an integer')
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be an integer')
+    if not 0 <= number <= MAX_ID:
+        raise ValueError(f'{name} must be between 0 and {MAX_ID}')
+    return number
+
+
+def age_at(date_of_birth, as_of):
+    return as_of.year - date_of_birth.year - ((as_of.month, as_of.day) < (date_of_birth.month, date_of_birth.day))
+
+
+class RateMatrix:
+    """Every PremiumRate held as parallel NumPy arrays, sorted for searchsorted.
+
+    Rows are grouped by (policy_id, coverage_id) and ordered by the low end
+    of their age range, so a whole batch of applicants is matched with one
+    searchsorted over group * AGE_SPAN + age. An applicant gets the rate
+    with the highest lower bound at or below their age, provided their age
+    is also within its upper bound. Rows whose ids or age_range cannot be
+    parsed are left out and listed in `skipped`.
+    """
+
+    def __init__(self, rows):
+        parsed = []
+        self.skipped = []
+        for rate_id, policy_id, coverage_id, age_range, rate_amount in rows:
+            try:
+                policy_id, coverage_id = parse_id(policy_id, 'policy_id'), parse_id(coverage_id, 'coverage_id')
+                low, high = parse_age_range(age_range)
+            except ValueError:
+                self.skipped.append(rate_id)
+                continue
+            parsed.append((rate_id, policy_id, coverage_id, low, high, float(rate_amount)))
+
+        rate_ids, policy_ids, coverage_ids, lows, highs, rates = (
+            (np.array(values) for values in zip(*parsed)) if parsed else ([] for _ in range(6)))
+        pairs = _pair(policy_ids, coverage_ids)
+        self.groups, group_of = np.unique(pairs, return_inverse=True)
+        keys = group_of.astype(np.int64) * AGE_SPAN + np.asarray(lows, dtype=np.int64)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.group_of = group_of[order]
+        self.rate_ids = np.asarray(rate_ids, dtype=np.int64)[order]
+        self.highs = np.asarray(highs, dtype=np.float64)[order]
+        self.rates = np.asarray(rates, dtype=np.float64)[order]
+
+    def __len__(self):
+        return len(self.rate_ids)
+
+    def match(self, policy_ids, coverage_ids, ages):
+        """Index into the rate arrays for each applicant, or -1 where no rate applies."""
+        pairs = _pair(policy_ids, coverage_ids)
+        group = np.searchsorted(self.groups, pairs)
+        group_found = group < len(self.groups)
+        group_found[group_found] = self.groups[group[group_found]] == pairs[group_found]
+
+        index = np.searchsorted(self.keys, group.astype(np.int64) * AGE_SPAN + ages, side='right') - 1
+        candidate = group_found & (index >= 0)
+        matched = candidate.copy()
+        matched[candidate] = ((self.group_of[index[candidate]] == group[candidate])
+                              & (ages[candidate] <= self.highs[index[candidate]]))
+        return np.where(matched, index, -1)
+
+
+class RateMatrixCache:
+    """Holds the current RateMatrix, rebuilding it after invalidate() or every `ttl` seconds.
+
+    Writes in this process call invalidate(); the TTL bounds how long other
+    workers keep quoting from rates that changed elsewhere.
+    """
+
+    def __init__(self, load_rows, ttl=60):
+        self.load_rows = load_rows
+        self.ttl = ttl
+        self._matrix = None
+        self._loaded_at = 0.0
+        self._lock = Lock()
+
+    def get(self):
+        matrix = self._matrix
+        if matrix is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return matrix
+        with self._lock:
+            if self._matrix is None or time.monotonic() - self._loaded_at >= self.ttl:
+                self._matrix = RateMatrix(self.load_rows())
+                self._loaded_at = time.monotonic()
+            return self._matrix
+
+    def invalidate(self):
+        with self._lock:
+            self._matrix = None
+
+
+def quote_batch(matrix, applicants, as_of, rate_unit, max_batch):
+    """Price every applicant against `matrix` and report on each of them.
+
+    premium = coverage_amount * rate_amount / rate_unit, rounded to cents.
+    Applicants come as dicts with policy_id, coverage_id, coverage_amount
+    and either age or date_of_birth (YYYY-MM-DD, aged at `as_of`).
+    """
+    if not isinstance(applicants, list):
+        raise QuoteError('Expected a JSON array of applicants')
+    if len(applicants) > max_batch:
+        raise QuoteError(f'At most {max_batch} applicants can be quoted at once')
+
+    results = [None] * len(applicants)
+    valid = []
+    for index, applicant in enumerate(applicants):
+        try:
+            valid.append((index, *_parse_applicant(applicant, as_of)))
+        except (KeyError, ValueError, TypeError) as e:
+            message = f'Missing field {e.args[0]}' if isinstance(e, KeyError) else str(e)
+            results[index] = {'index': index, 'status': 'invalid', 'message': message}
+
+    if valid:
+        indexes, policy_ids, coverage_ids, ages, amounts = (np.array(values) for values in zip(*valid))
+        amounts = amounts.astype(np.float64)
+        rows = matrix.match(policy_ids, coverage_ids, ages)
+        found = rows >= 0
+        premiums = np.zeros(len(rows))
+        premiums[found] = np.round(amounts[found] * matrix.rates[rows[found]] / rate_unit, 2)
+        for index, row, age, premium in zip(indexes.tolist(), rows.tolist(), ages.tolist(), premiums.tolist()):
+            if row < 0:
+                results[index] = {'index': index, 'status': 'unrated', 'age': age,
+                                  'message': 'No premium rate for this policy, coverage and age'}
+            else:
+                results[index] = {'index': index, 'status': 'quoted', 'age': age,
+                                  'rate_id': int(matrix.rate_ids[row]), 'premium': f'{premium:.2f}'}
+    return results
+
+
+def summarize_quotes(results):
+    summary = {'quoted': 0, 'unrated': 0, 'invalid': 0}
+    for result in results:
+        summary[result['status']] += 1
+    return summary
+
+
+def _parse_applicant(applicant, as_of):
+    if not isinstance(applicant, dict):
+        raise ValueError('Each applicant must be a JSON object')
+    if applicant.get('age') is not None:
+        age = int(applicant['age'])
+    else:
+        age = age_at(datetime.strptime(applicant['date_of_birth'], '%Y-%m-%d').date(), as_of)
+    if not 0 <= age < AGE_SPAN:
+        raise ValueError(f'age must be between 0 and {AGE_SPAN - 1}')
+    coverage_amount = float(applicant['coverage_amount'])
+    if not np.isfinite(coverage_amount) or coverage_amount < 0:
+        raise ValueError('coverage_amount must be a non-negative number')
+    return parse_id(applicant['policy_id'], 'policy_id'), parse_id(applicant['coverage_id'], 'coverage_id'), age, coverage_amount
+
+
+def _pair(policy_ids, coverage_ids):
+    # One int64 per (policy_id, coverage_id); parse_id() keeps both within 32 bits.
+    return (np.asarray(policy_ids, dtype=np.int64) << 32) | np.asarray(coverage_ids, dtype=np.int64)
@@ -0,0 +1,123 @@
+import os
+import sys
+import threading
+import unittest
+from collections import namedtuple
+from decimal import Decimal
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from premium_quoting.interval_index import AgeRangeIndex
+
+Row = namedtuple('Row', ['rate_id', 'policy_id', 'coverage_id', 'age_range', 'rate_amount'])
+
+ROWS = [
+    Row(1, 10, 1, '18-25', Decimal('4.00')),
+    Row(2, 10, 1, '26-35', Decimal('5.00')),
+    Row(3, 10, 1, '46-55', Decimal('7.00')),
+    Row(4, 10, 1, '66+', Decimal('9.00')),
+    Row(5, 10, 2, '40', Decimal('6.00')),
+    Row(6, 10, 2, 'sixty', Decimal('1.00'))
+]
+
+
+class AgeRangeIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.rows = list(ROWS)
+        self.loads = 0
+        self.clock = mock.patch('premium_quoting.interval_index.time.monotonic', return_value=1000.0)
+        self.now = self.clock.start()
+        self.index = AgeRangeIndex(self.load_rows, ttl=60)
+
+    def tearDown(self):
+        self.clock.stop()
+
+    def load_rows(self):
+        self.loads += 1
+        return list(self.rows)
+
+    def rate_id(self, policy_id, coverage_id, age):
+        interval = self.index.lookup(policy_id, coverage_id, age)
+        return interval.rate_id if interval else None
+
+    def test_lookup_matches_inclusive_bounds_and_open_ranges(self):
+        self.assertEqual([self.rate_id(10, 1, age) for age in (17, 18, 25, 26, 35, 36, 46, 65, 66, 120)],
+                         [None, 1, 1, 2, 2, None, 3, None, 4, 4])
+        self.assertEqual([self.rate_id(10, 2, age) for age in (39, 40, 41)], [None, 5, None])
+        self.assertIsNone(self.rate_id(11, 1, 20))
+        self.assertEqual(self.loads, 1)
+
+    def test_unparsable_rows_never_match(self):
+        self.assertIsNone(self.rate_id(10, 2, 60))
+
+    def test_overlaps_are_found_against_the_rows_passed_in(self):
+        group = [row for row in self.rows if (row.policy_id, row.coverage_id) == (10, 1)]
+        self.assertEqual(self.index.overlapping(10, 1, 20, 22, group).rate_id, 1)
+        self.assertEqual(self.index.overlapping(10, 1, 20, 30, group).rate_id, 2)
+        self.assertEqual(self.index.overlapping(10, 1, 50, float('inf'), group).rate_id, 4)
+        self.assertIsNone(self.index.overlapping(10, 1, 36, 45, group))
+        self.assertIsNone(self.index.overlapping(10, 1, 56, 65, group))
+        # An update of rate 2 is only checked against the other rates.
+        self.assertIsNone(self.index.overlapping(10, 1, 27, 34, group, exclude_rate_id=2))
+        self.assertEqual(self.index.overlapping(10, 1, 24, 34, group, exclude_rate_id=2).rate_id, 1)
+
+        # Another worker moved rate 3 away; the rows passed in win over the index.
+        group = [row for row in group if row.rate_id != 3] + [Row(7, 10, 1, '36-45', Decimal('6.00'))]
+        self.assertEqual(self.index.overlapping(10, 1, 40, 50, group).rate_id, 7)
+        self.assertIsNone(self.rate_id(10, 1, 50))
+        self.assertEqual(self.rate_id(10, 1, 40), 7)
+
+    def test_put_and_remove_update_the_index_in_place(self):
+        self.rate_id(10, 1, 20)
+        self.index.put(7, 10, 1, '36-45', Decimal('6.00'))
+        self.assertEqual(self.rate_id(10, 1, 40), 7)
+        # An update that moves a rate to another group takes it out of the old one.
+        self.index.put(7, 12, 3, '36-45', Decimal('6.00'))
+        self.assertIsNone(self.rate_id(10, 1, 40))
+        self.assertEqual(self.rate_id(12, 3, 40), 7)
+        self.index.remove(1)
+        self.assertIsNone(self.rate_id(10, 1, 20))
+        self.assertEqual(self.loads, 1)
+
+    def test_index_is_reloaded_once_the_ttl_is_over(self):
+        self.rate_id(10, 1, 20)
+        self.rows[0] = Row(1, 10, 1, '18-21', Decimal('4.00'))
+        self.now.return_value = 1059.0
+        self.assertEqual(self.rate_id(10, 1, 23), 1)
+        self.now.return_value = 1060.0
+        self.assertIsNone(self.rate_id(10, 1, 23))
+        self.assertEqual(self.loads, 2)
+
+    def test_lookups_during_a_reload_read_the_old_index_and_writes_survive_it(self):
+        self.rate_id(10, 1, 20)
+        loading, release = threading.Event(), threading.Event()
+
+        def slow_load():
+            loading.set()
+            release.wait(5)
+            # Read before the put below, so rate 7 is missing from these rows.
+            return [row._replace(age_range='41') if row.rate_id == 5 else row for row in ROWS if row.rate_id != 1]
+
+        self.index.load_rows = slow_load
+        self.now.return_value = 2000.0
+        reloader = threading.Thread(target=self.index.lookup, args=(10, 1, 20))
+        reloader.start()
+        self.assertTrue(loading.wait(5))
+        # The reload is running: other callers neither wait nor start another one.
+        self.assertEqual(self.rate_id(10, 1, 20), 1)
+        self.index.put(7, 10, 1, '36-45', Decimal('6.00'))
+        self.assertEqual(self.rate_id(10, 1, 40), 7)
+        release.set()
+        reloader.join(5)
+
+        self.assertFalse(reloader.is_alive())
+        # The group written during the reload is kept as written...
+        self.assertEqual(self.rate_id(10, 1, 40), 7)
+        self.assertEqual(self.rate_id(10, 1, 20), 1)
+        # ...and every other group comes from the reloaded rows.
+        self.assertEqual([self.rate_id(10, 2, age) for age in (40, 41)], [None, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
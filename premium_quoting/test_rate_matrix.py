@@ -0,0 +1,129 @@
+import os
+import sys
+import unittest
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from premium_quoting.rate_matrix import (MAX_ID, QuoteError, RateMatrix, RateMatrixCache, age_at, parse_age_range,
+                                         quote_batch, summarize_quotes)
+
+ROWS = [
+    (1, 10, 1, '18-25', Decimal('4.00')),
+    (2, 10, 1, '26 - 35', Decimal('5.50')),
+    (3, 10, 1, '66+', Decimal('9.00')),
+    (4, 10, 2, '40', Decimal('6.00')),
+    (5, 11, 1, '18-99', Decimal('3.00'))
+]
+
+AS_OF = date(2024, 6, 15)
+
+
+def applicant(policy_id=10, coverage_id=1, age=30, coverage_amount=100000, **fields):
+    return dict(fields, policy_id=policy_id, coverage_id=coverage_id, age=age, coverage_amount=coverage_amount)
+
+
+class ParseTest(unittest.TestCase):
+    def test_age_ranges(self):
+        self.assertEqual(parse_age_range('18-25'), (18, 25))
+        self.assertEqual(parse_age_range(' 26 – 35 '), (26, 35))
+        self.assertEqual(parse_age_range('65+'), (65, float('inf')))
+        self.assertEqual(parse_age_range('40'), (40, 40))
+        for malformed in ('25-18', 'adult', '', '-5', '2000+', None, 18, ['18-25']):
+            with self.assertRaises(ValueError):
+                parse_age_range(malformed)
+
+    def test_age_at_counts_completed_years(self):
+        self.assertEqual(age_at(date(1990, 6, 15), AS_OF), 34)
+        self.assertEqual(age_at(date(1990, 6, 16), AS_OF), 33)
+
+
+class QuoteTest(unittest.TestCase):
+    def setUp(self):
+        self.matrix = RateMatrix(ROWS)
+
+    def quote(self, applicants, max_batch=100):
+        return quote_batch(self.matrix, applicants, AS_OF, 1000, max_batch)
+
+    def test_premiums_use_the_rate_of_the_matching_band(self):
+        results = self.quote([applicant(age=18), applicant(age=35, coverage_amount=12345),
+                              applicant(age=90), applicant(coverage_id=2, age=40), applicant(policy_id=11, age=60)])
+        self.assertEqual([(result['rate_id'], result['premium']) for result in results],
+                         [(1, '400.00'), (2, '67.90'), (3, '900.00'), (4, '600.00'), (5, '300.00')])
+
+    def test_date_of_birth_is_aged_at_as_of(self):
+        (result,) = self.quote([{'policy_id': 10, 'coverage_id': 1, 'date_of_birth': '1998-06-16', 'coverage_amount': 1000}])
+        self.assertEqual((result['age'], result['rate_id']), (25, 1))
+
+    def test_gaps_and_unknown_groups_are_unrated(self):
+        results = self.quote([applicant(age=17), applicant(age=50), applicant(coverage_id=2, age=41), applicant(policy_id=12)])
+        self.assertEqual([result['status'] for result in results], ['unrated'] * 4)
+
+    def test_each_bad_applicant_is_reported_on_its_own(self):
+        results = self.quote([
+            applicant(),
+            'not an object',
+            {'policy_id': 10, 'coverage_id': 1, 'coverage_amount': 1000},
+            applicant(age=2000),
+            applicant(coverage_amount=-1),
+            applicant(policy_id=MAX_ID + 1),
+            applicant(coverage_id=True),
+            applicant(policy_id=10.5),
+            applicant(policy_id='ten')
+        ])
+        self.assertEqual(results[0]['status'], 'quoted')
+        self.assertEqual([result['status'] for result in results[1:]], ['invalid'] * 8)
+        self.assertEqual(results[2]['message'], 'Missing field date_of_birth')
+        self.assertEqual(results[5]['message'], f'policy_id must be between 0 and {MAX_ID}')
+        self.assertEqual(summarize_quotes(results), {'quoted': 1, 'unrated': 0, 'invalid': 8})
+
+    def test_the_largest_ids_do_not_collide(self):
+        matrix = RateMatrix([(1, MAX_ID, 0, '18-99', Decimal('1.00')), (2, 0, MAX_ID, '18-99', Decimal('2.00'))])
+        results = quote_batch(matrix, [applicant(policy_id=MAX_ID, coverage_id=0), applicant(policy_id=0, coverage_id=MAX_ID),
+                                       applicant(policy_id=MAX_ID, coverage_id=MAX_ID)], AS_OF, 1000, 10)
+        self.assertEqual([result.get('rate_id') for result in results], [1, 2, None])
+
+    def test_batches_must_be_lists_within_the_limit(self):
+        with self.assertRaisesRegex(QuoteError, 'JSON array'):
+            self.quote({'policy_id': 10})
+        with self.assertRaisesRegex(QuoteError, 'At most 2'):
+            self.quote([applicant()] * 3, max_batch=2)
+        self.assertEqual(self.quote([]), [])
+
+    def test_rows_that_cannot_be_parsed_are_skipped(self):
+        matrix = RateMatrix(ROWS + [(6, 10, 3, 'adults', Decimal('1.00')), (7, None, 1, '18-25', Decimal('1.00')),
+                                    (8, 2 ** 32, 1, '18-25', Decimal('1.00'))])
+        self.assertEqual(len(matrix), len(ROWS))
+        self.assertEqual(matrix.skipped, [6, 7, 8])
+        self.assertEqual(len(RateMatrix([])), 0)
+
+
+class RateMatrixCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.loads = 0
+        self.clock = mock.patch('premium_quoting.rate_matrix.time.monotonic', return_value=1000.0)
+        self.now = self.clock.start()
+        self.cache = RateMatrixCache(self.load_rows, ttl=60)
+
+    def tearDown(self):
+        self.clock.stop()
+
+    def load_rows(self):
+        self.loads += 1
+        return ROWS
+
+    def test_matrix_is_rebuilt_after_the_ttl_or_invalidate(self):
+        matrix = self.cache.get()
+        self.now.return_value = 1059.0
+        self.assertIs(self.cache.get(), matrix)
+        self.now.return_value = 1060.0
+        self.assertIsNot(self.cache.get(), matrix)
+        self.cache.invalidate()
+        self.cache.get()
+        self.assertEqual(self.loads, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
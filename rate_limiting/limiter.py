@@ -0,0 +1,81 @@
+import time
+import jwt
+from os import environ
+from flask import current_app, request
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from prometheus_client import Counter, Histogram
+from jwt_required.auth_token import decode_token
+from hosting.request_timing import timed
+
+
+RATE_LIMIT_CHECK_SECONDS = Histogram('rate_limit_check_seconds', 'Time taken to decide whether a request is rate limited',
+                                     ['endpoint'], buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25))
+RATE_LIMIT_DECISIONS = Counter('rate_limit_decisions_total', 'Rate limit checks by outcome', ['endpoint', 'decision'])
+
+
+def identity_key():
+    """The JWT user_id when the request carries a valid token, else the client address."""
+    token = request.headers.get('access-token')
+    if token:
+        try:
+            with timed('auth'):
+                user_id = decode_token(token, current_app.config.get('SECRET_KEY')).get('user_id')
+        except jwt.InvalidTokenError:
+            user_id = None
+        if user_id is not None:
+            return f'user:{user_id}'
+    return f'ip:{get_remote_address()}'
+
+
+class TimedStrategy:
+    """Wraps a limits strategy, timing and counting every hit() against storage."""
+
+    def __init__(self, strategy):
+        self._strategy = strategy
+
+    def hit(self, item, *identifiers, **kwargs):
+        endpoint = request.endpoint or 'unknown'
+        start = time.perf_counter()
+        try:
+            allowed = self._strategy.hit(item, *identifiers, **kwargs)
+        finally:
+            RATE_LIMIT_CHECK_SECONDS.labels(endpoint).observe(time.perf_counter() - start)
+        RATE_LIMIT_DECISIONS.labels(endpoint, 'allowed' if allowed else 'limited').inc()
+        return allowed
+
+    def __getattr__(self, name):
+        return getattr(self._strategy, name)
+
+
+class InstrumentedLimiter(Limiter):
+    """Flask-Limiter whose limit decisions are timed and counted per endpoint.
+
+    Every limit that applies to a request is decided by one hit() on the
+    strategy returned here; with a Redis backend that is a single script
+    call, so the histogram is the round trip the limiter adds.
+    """
+
+    @property
+    def limiter(self):
+        return TimedStrategy(super().limiter)
+
+
+def create_limiter():
+    """A limiter keyed per route and per identity_key(), on shared storage.
+
+    RATELIMIT_STORAGE_URI selects the backend: redis://host:6379 (or
+    redis+sentinel://, redis+cluster://) shares the counters between every
+    worker and replica, memory:// keeps them per process for local runs.
+    The default moving-window strategy is a true sliding window, checked
+    atomically with one Lua script call on Redis. If the storage becomes
+    unreachable the limiter falls back to per-process memory rather than
+    failing requests.
+    """
+    return InstrumentedLimiter(
+        identity_key,
+        storage_uri=environ.get('RATELIMIT_STORAGE_URI', 'memory://'),
+        strategy=environ.get('RATELIMIT_STRATEGY', 'moving-window'),
+        key_prefix=environ.get('RATELIMIT_KEY_PREFIX', 'asiguraez'),
+        in_memory_fallback_enabled=True
+    )
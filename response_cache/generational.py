@@ -0,0 +1,82 @@
+import hashlib
+import logging
+import uuid
+from functools import wraps
+from os import environ
+from urllib.parse import urlencode
+from flask import make_response, request
+from hosting.replicas import read_primary
+
+
+logger = logging.getLogger(__name__)
+
+
+def cache_config():
+    """Flask-Caching settings for the GenerationalCache of a service.
+
+    CACHE_REDIS_URL selects RedisCache, so every worker and replica shares
+    the responses and the generation that invalidate() replaces. Without
+    it the cache is a per-process SimpleCache: a write then only
+    invalidates the worker that served it, and the other workers keep
+    their pages for up to the timeout. That is only fit for a single
+    worker. CACHE_TYPE overrides the choice.
+    """
+    redis_url = environ.get('CACHE_REDIS_URL')
+    cache_type = environ.get('CACHE_TYPE', 'RedisCache' if redis_url else 'SimpleCache')
+    if cache_type == 'SimpleCache':
+        logger.warning('Response cache is per process; set CACHE_REDIS_URL when running more than one worker')
+    return {'CACHE_TYPE': cache_type, 'CACHE_REDIS_URL': redis_url}
+
+
+class GenerationalCache:
+    """Response cache for a list endpoint keyed on the full query string.
+
+    Every key embeds the namespace's current generation, which lives in
+    the same backend as the responses. Write handlers call invalidate() to
+    replace the generation with a fresh one, so every worker sharing the
+    backend stops seeing the old entries at once; those simply expire.
+
+    Misses are rendered from the primary: a lagging replica would otherwise
+    store the page from before a write under the generation that write
+    just created, and every worker would serve it until the timeout.
+    """
+
+    def __init__(self, cache, namespace, timeout=360):
+        self.cache = cache
+        self.namespace = namespace
+        self.timeout = timeout
+        self._generation_key = f'{namespace}:generation'
+
+    def cached(self, view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = self._response_key()
+            cached_response = self.cache.get(key)
+            if cached_response is not None:
+                body, status, content_type = cached_response
+                return make_response(body, status, {'Content-Type': content_type})
+
+            read_primary()
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                self.cache.set(key, (response.get_data(), response.status_code, response.content_type),
+                               timeout=self.timeout)
+            return response
+        return wrapper
+
+    def invalidate(self):
+        # Generations are never reused, so two writers racing each other can
+        # only orphan entries, never bring an old generation back.
+        self.cache.set(self._generation_key, uuid.uuid4().hex, timeout=0)
+
+    def _generation(self):
+        generation = self.cache.get(self._generation_key)
+        if generation is None:
+            self.cache.add(self._generation_key, uuid.uuid4().hex, timeout=0)
+            generation = self.cache.get(self._generation_key)
+        return generation
+
+    def _response_key(self):
+        query_string = urlencode(sorted(request.args.items(multi=True)))
+        digest = hashlib.sha1(query_string.encode('utf-8')).hexdigest()
+        return f'{self.namespace}:{self._generation()}:{digest}'
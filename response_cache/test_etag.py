@@ -0,0 +1,109 @@
+import os
+import sys
+import unittest
+from datetime import datetime
+from flask import Flask, jsonify, make_response
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from json_encoding.encoder import FieldSelectionError, ModelEncoder, json_response
+from response_cache.etag import etag_by_version, remember_version, version_columns
+
+
+class EtagTest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+        self.db = db = SQLAlchemy(self.app)
+
+        class Address(db.Model):
+            __tablename__ = 'addresses'
+            address_id = db.Column(db.Integer, primary_key=True)
+            city = db.Column(db.String(100), nullable=False)
+            zip_code = db.Column(db.String(20), nullable=False)
+            updated_at = db.Column(db.TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+        encoder = ModelEncoder(Address, exclude=('updated_at',))
+        self.Address = Address
+        self.views = 0
+
+        # Built like the services' single-resource GETs.
+        @self.app.route('/addresses/<int:address_id>')
+        @etag_by_version(Address)
+        def get_address(address_id):
+            self.views += 1
+            try:
+                field_names = encoder.requested_fields()
+            except FieldSelectionError as e:
+                return make_response(jsonify({'message': str(e)}), 400)
+            address = encoder.select(Address.query, field_names, version_columns(Address)).filter(Address.address_id == address_id).first()
+            if address:
+                remember_version(address.updated_at)
+                return json_response(encoder.serializer(field_names)(address), 200)
+            return make_response(jsonify({'message': 'Address not found'}), 404)
+
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        db.session.add(Address(address_id=1, city='Cluj', zip_code='400001', updated_at=datetime(2024, 5, 1, 9, 30)))
+        db.session.commit()
+        self.selects = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda connection, cursor, statement, *args: self.selects.append(statement) if statement.startswith('SELECT') else None)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.db.session.remove()
+        self.context.pop()
+
+    def get(self, path, etag=None):
+        return self.client.get(path, headers={'If-None-Match': f'"{etag}"'} if etag else {})
+
+    def test_plain_get_is_tagged_from_the_loaded_row(self):
+        response = self.get('/addresses/1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_etag(), ('1-20240501093000000000', False))
+        self.assertEqual(response.get_json(), {'address_id': 1, 'city': 'Cluj', 'zip_code': '400001'})
+        self.assertEqual(len(self.selects), 1)
+
+    def test_matching_tag_gets_a_304_without_running_the_view(self):
+        etag, _ = self.get('/addresses/1').get_etag()
+        self.selects.clear()
+        response = self.get('/addresses/1', etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+        self.assertEqual(response.get_etag(), (etag, False))
+        self.assertEqual((self.views, len(self.selects)), (1, 1))
+
+    def test_stale_tag_gets_the_new_row_and_tag(self):
+        etag, _ = self.get('/addresses/1').get_etag()
+        self.db.session.get(self.Address, 1).city = 'Iasi'
+        self.db.session.commit()
+        response = self.get('/addresses/1', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['city'], 'Iasi')
+        self.assertNotEqual(response.get_etag()[0], etag)
+
+    def test_each_field_selection_has_its_own_tag(self):
+        full, _ = self.get('/addresses/1').get_etag()
+        response = self.get('/addresses/1?fields=city')
+        self.assertEqual(response.get_json(), {'city': 'Cluj'})
+        partial, _ = response.get_etag()
+        self.assertTrue(partial.startswith(full + '-'))
+        self.assertEqual(self.get('/addresses/1?fields=city', full).status_code, 200)
+        self.assertEqual(self.get('/addresses/1?fields=city', partial).status_code, 304)
+
+    def test_missing_rows_and_errors_are_not_tagged(self):
+        for etag in (None, '2-20240501093000000000'):
+            response = self.get('/addresses/2', etag)
+            self.assertEqual(response.status_code, 404)
+            self.assertIsNone(response.get_etag()[0])
+        response = self.get('/addresses/1?fields=nope')
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(response.get_etag()[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
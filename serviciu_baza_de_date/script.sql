@@ -324,4 +324,57 @@ CREATE TRIGGER update_payments_updated_at BEFORE UPDATE ON Payments
 FOR EACH ROW EXECUTE FUNCTION update_updated_at();
 
 CREATE TRIGGER update_support_tickets_updated_at BEFORE UPDATE ON SupportTickets
-FOR EACH ROW EXECUTE FUNCTION update_updated_at();
\ No newline at end of file
+FOR EACH ROW EXECUTE FUNCTION update_updated_at();
+
+-- keyset pagination on created_at (policy_id/user_id break ties)
+CREATE INDEX idx_policies_created_at ON Policies (created_at, policy_id);
+CREATE INDEX idx_users_created_at ON Users (created_at, user_id);
+
+-- claims aggregation (GET /claims/aggregate): date ranges and per-policy
+-- groups are answered from index-only scans
+CREATE INDEX idx_claims_claim_date ON Claims (claim_date) INCLUDE (policy_id, status, claim_amount);
+CREATE INDEX idx_claims_policy_id_claim_date ON Claims (policy_id, claim_date) INCLUDE (claim_amount);
+
+-- audit events are now written to Log in batches by the services
+-- (audit_log/pipeline.py), so the per-statement triggers are dropped
+DROP TRIGGER IF EXISTS log_users_trigger ON Users;
+DROP TRIGGER IF EXISTS log_insured_trigger ON Insured;
+DROP TRIGGER IF EXISTS log_policies_trigger ON Policies;
+DROP TRIGGER IF EXISTS log_policytypes_trigger ON PolicyTypes;
+DROP TRIGGER IF EXISTS log_claims_trigger ON Claims;
+DROP TRIGGER IF EXISTS log_payments_trigger ON Payments;
+DROP TRIGGER IF EXISTS log_beneficiaries_trigger ON Beneficiaries;
+DROP TRIGGER IF EXISTS log_addresses_trigger ON Addresses;
+DROP TRIGGER IF EXISTS log_contacts_trigger ON Contacts;
+DROP TRIGGER IF EXISTS log_coveragetypes_trigger ON CoverageTypes;
+DROP TRIGGER IF EXISTS log_documents_trigger ON Documents;
+DROP TRIGGER IF EXISTS log_premiumrates_trigger ON PremiumRates;
+DROP TRIGGER IF EXISTS log_supporttickets_trigger ON SupportTickets;
+DROP TRIGGER IF EXISTS log_insurancerequests_trigger ON InsuranceRequests;
+DROP TRIGGER IF EXISTS log_insuranceproposals_trigger ON InsuranceProposals;
+DROP FUNCTION IF EXISTS log_database_operation();
+
+-- list filters (list_queries/filters.py): the common equality filter plus
+-- a date range or sort on the same list is served by one index
+CREATE INDEX idx_claims_status_claim_date ON Claims (status, claim_date);
+CREATE INDEX idx_payments_policy_id_payment_date ON Payments (policy_id, payment_date);
+CREATE INDEX idx_payments_status_payment_date ON Payments (status, payment_date);
+CREATE INDEX idx_support_tickets_status_created_at ON SupportTickets (status, created_at);
+CREATE INDEX idx_support_tickets_assigned_to_status ON SupportTickets (assigned_to, status);
+CREATE INDEX idx_insurance_requests_status_request_date ON InsuranceRequests (status, request_date);
+CREATE INDEX idx_insurance_proposals_status_proposal_date ON InsuranceProposals (status, proposal_date);
+
+-- full-text search (serviciu_search): tsvector columns kept in sync by
+-- Postgres, GIN indexes over them, and a trigram index for fuzzy matches
+-- on insured names
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE Insured ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', first_name || ' ' || last_name)) STORED;
+ALTER TABLE SupportTickets ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (setweight(to_tsvector('english', subject), 'A') ||
+                         setweight(to_tsvector('english', description), 'B')) STORED;
+
+CREATE INDEX idx_insured_search_vector ON Insured USING GIN (search_vector);
+CREATE INDEX idx_insured_full_name_trgm ON Insured USING GIN ((first_name || ' ' || last_name) gin_trgm_ops);
+CREATE INDEX idx_support_tickets_search_vector ON SupportTickets USING GIN (search_vector);
@@ -1,38 +1,39 @@
-from flask import Flask, request, make_response, jsonify
-from flask_sqlalchemy import SQLAlchemy
-from flask_cors import CORS
+from flask import Blueprint, request, make_response, jsonify
 from os import environ
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
 from flask_bcrypt import Bcrypt
 import sys
 from flask_caching import Cache
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
-from prometheus_flask_exporter  import PrometheusMetrics
 from marshmallow import Schema, fields, validate
+from sqlalchemy import column, select, table
 from dotenv import load_dotenv
 
 
 sys.path.append('../')
 
 from jwt_required.auth_token import jwt_auth
-
-app = Flask(__name__)
-bcrypt = Bcrypt(app)
-cache = Cache(app)
-limiter = Limiter(get_remote_address,app=app)
-metrics = PrometheusMetrics(app)
-CORS(app)
+from list_queries.keyset import PaginationError, key_orderings, keyset_page, wants_keyset
+from list_queries.filters import FilterError, QueryFilter
+from list_queries.multiget import IdLookup, wants_ids
+from response_cache.generational import GenerationalCache, cache_config
+from response_cache.etag import etag_by_version, remember_version, version_columns
+from json_encoding.encoder import FieldSelectionError, ModelEncoder, json_response
+from hosting.extensions import db, limiter
+from hosting.service_app import create_service_app
+
+bp = Blueprint('policies', __name__)
+bcrypt = Bcrypt()
+cache = Cache(config=cache_config())
 
 load_dotenv()
 
-app.config['SQLALCHEMY_DATABASE_URI'] = environ.get('DATABASE_URL')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-#change this
-app.config['SECRET_KEY'] = environ.get('SECRET_KEY')
+@bp.record_once
+def init_extensions(state):
+    bcrypt.init_app(state.app)
+    cache.init_app(state.app)
 
-db = SQLAlchemy(app)
+policies_cache = GenerationalCache(cache, 'policies', timeout=360)
 
 class Policy(db.Model):
     __tablename__ = 'policies'
@@ -44,6 +45,7 @@ class Policy(db.Model):
     coverage_amount = db.Column(db.Numeric(15, 2), nullable=False)
     premium_amount = db.Column(db.Numeric(15, 2), nullable=False)
     created_at = db.Column(db.TIMESTAMP, default=datetime.utcnow)
+    updated_at = db.Column(db.TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
     policy_type_id = db.Column(db.Integer, nullable=False)
     insured_id = db.Column(db.Integer, nullable=False)
 
@@ -58,7 +60,36 @@ class Policy(db.Model):
             'policy_type_id': self.policy_type_id,
             'insured_id': self.insured_id
         }
+
+policy_encoder = ModelEncoder(Policy, exclude=('updated_at',))
+policy_filters = QueryFilter(Policy.policy_id, Policy.policy_name, Policy.coverage_amount, Policy.premium_amount, Policy.created_at, Policy.policy_type_id, Policy.insured_id)
+policy_lookup = IdLookup(policy_encoder, Policy.policy_id)
     
+# Rows owned by the claims, payments, beneficiaries and documents services,
+# read here only to compose GET /policies/<id>/full. Plain table() constructs
+# keep them out of the shared metadata.
+POLICY_RELATED_TABLES = {
+    'claims': table('claims', column('claim_id'), column('policy_id'), column('claim_date'),
+                    column('claim_amount'), column('status'), column('created_at'), schema='asiguraez'),
+    'payments': table('payments', column('payment_id'), column('policy_id'), column('payment_date'),
+                      column('amount'), column('status'), column('created_at'), schema='asiguraez'),
+    'beneficiaries': table('beneficiaries', column('beneficiary_id'), column('policy_id'),
+                           column('beneficiary_name'), column('relationship'), column('created_at'),
+                           schema='asiguraez'),
+    'documents': table('documents', column('document_id'), column('policy_id'), column('document_type'),
+                       column('file_path'), column('created_at'), schema='asiguraez')
+}
+
+def json_related_row(row):
+    result = {}
+    for key, value in row.items():
+        if isinstance(value, Decimal):
+            value = float(value)
+        elif isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        result[key] = value
+    return result
+
 class PolicySchema(Schema):
     policy_name = fields.Str(required=True,validate=validate.Length(max=255))
     description = fields.Str()
@@ -69,35 +100,70 @@ class PolicySchema(Schema):
     insured_id =  fields.Integer(required=True)  
 
 
-@app.route('/policies', methods=['GET'])
-@cache.cached(timeout=360)
+@bp.route('/policies', methods=['GET'])
+@policies_cache.cached
 def get_policies():
     try:
+        field_names = policy_encoder.requested_fields()
+        if wants_ids():
+            return json_response(policy_lookup.get_many(Policy.query, field_names), 200)
+        query = policy_filters.apply(Policy.query)
+        if wants_keyset():
+            orderings = key_orderings(Policy.policy_id, Policy.created_at)
+            page = keyset_page(policy_encoder.select(query, field_names, orderings), orderings, policy_encoder.serializer(field_names), 'policies')
+            return make_response(jsonify(page), 200)
         page = int(request.args.get('page',1))
         per_page = int(request.args.get('per_page',5))
-        policies_pagination = Policy.query.paginate(page=page, per_page=per_page)
-        policies = [policy.json_policy() for policy in policies_pagination.items]
+        policies_pagination = policy_encoder.select(query, field_names).paginate(page=page, per_page=per_page)
+        serialize = policy_encoder.serializer(field_names)
+        policies = [serialize(row) for row in policies_pagination.items]
 
         return make_response(jsonify({
             'policies': policies,
             'pages' : policies_pagination.pages,
             'total_policies' : policies_pagination.total
         }),200)
+    except (PaginationError, FieldSelectionError, FilterError) as e:
+        return make_response(jsonify({'message': str(e)}), 400)
     except Exception as e:
         return make_response(jsonify({'message': f'Error getting policies: {str(e)}'}), 500)
 
-@app.route('/policies/<int:policy_id>', methods=['GET'])
+@bp.route('/policies/<int:policy_id>', methods=['GET'])
+@etag_by_version(Policy)
 def get_policy(policy_id):
     try:
-        policy = Policy.query.get(policy_id)
+        field_names = policy_encoder.requested_fields()
+        policy = policy_encoder.select(Policy.query, field_names, version_columns(Policy)).filter(Policy.policy_id == policy_id).first()
         if policy:
-            return make_response(jsonify(policy.json_policy()), 200)
+            remember_version(policy.updated_at)
+            return json_response(policy_encoder.serializer(field_names)(policy), 200)
         else:
             return make_response(jsonify({'message': 'Policy not found'}), 404)
+    except FieldSelectionError as e:
+        return make_response(jsonify({'message': str(e)}), 400)
     except Exception as e:
         return make_response(jsonify({'message': f'Error getting policy: {str(e)}'}), 500)
 
-@app.route('/policies', methods=['POST'])
+@bp.route('/policies/<int:policy_id>/full', methods=['GET'])
+def get_policy_full(policy_id):
+    try:
+        policy = Policy.query.get(policy_id)
+        if not policy:
+            return make_response(jsonify({'message': 'Policy not found'}), 404)
+
+        # One query per related table, each served by its policy_id index.
+        policy_full = policy.json_policy()
+        for name, related in POLICY_RELATED_TABLES.items():
+            primary_key = list(related.c)[0]
+            rows = db.session.execute(
+                select(related).where(related.c.policy_id == policy_id).order_by(primary_key))
+            policy_full[name] = [json_related_row(row) for row in rows.mappings()]
+
+        return make_response(jsonify(policy_full), 200)
+    except Exception as e:
+        return make_response(jsonify({'message': f'Error getting policy: {str(e)}'}), 500)
+
+@bp.route('/policies', methods=['POST'])
 @limiter.limit("5 per minute")
 def add_policy():
     try:
@@ -121,12 +187,13 @@ def add_policy():
 
         db.session.add(new_policy)
         db.session.commit()
+        policies_cache.invalidate()
 
         return make_response(jsonify({'message': 'Policy added successfully'}), 201)
     except Exception as e:
         return make_response(jsonify({'message': f'Error adding policy: {str(e)}'}), 500)
 
-@app.route('/policies/<int:policy_id>', methods=['PUT'])
+@bp.route('/policies/<int:policy_id>', methods=['PUT'])
 @jwt_auth
 def update_policy(policy_id):
     try:
@@ -148,12 +215,14 @@ def update_policy(policy_id):
         policy.insured_id = data.get('insured_id', policy.insured_id)
 
         db.session.commit()
+        policy_lookup.forget(policy_id)
+        policies_cache.invalidate()
 
         return make_response(jsonify({'message': 'Policy updated successfully'}), 200)
     except Exception as e:
         return make_response(jsonify({'message': f'Error updating policy: {str(e)}'}), 500)
 
-@app.route('/policies/<int:policy_id>', methods=['DELETE'])
+@bp.route('/policies/<int:policy_id>', methods=['DELETE'])
 @jwt_auth
 def delete_policy(policy_id):
     try:
@@ -163,10 +232,19 @@ def delete_policy(policy_id):
 
         db.session.delete(policy)
         db.session.commit()
+        policy_lookup.forget(policy_id)
+        policies_cache.invalidate()
 
         return make_response(jsonify({'message': 'Policy deleted successfully'}), 200)
     except Exception as e:
         return make_response(jsonify({'message': f'Error deleting policy: {str(e)}'}), 500)
 
+def create_app():
+    return create_service_app(__name__, [bp], {
+        'SQLALCHEMY_DATABASE_URI': environ.get('DATABASE_URL'),
+        #change this
+        'SECRET_KEY': environ.get('SECRET_KEY')
+    })
+
 if __name__ == '__main__':
-    app.run(debug=True)  
+    create_app().run(debug=True)  